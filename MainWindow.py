@@ -1,20 +1,23 @@
 import os
 import asyncio
-import sys
+from contextlib import aclosing
 
-from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QPushButton, QLabel, QWidget, QListWidget, QListWidgetItem, QHBoxLayout, QScrollArea, QMessageBox
-from PySide6.QtGui import QPixmap
-import qt_material
-from qasync import QEventLoop, asyncSlot, QApplication as QAsyncApplication
+from PySide6.QtCore import Qt, QUrl, QTimer, Signal
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QPushButton, QLabel, QWidget, QListView, QHBoxLayout, QScrollArea, QMessageBox, QLineEdit, QComboBox, QProgressBar, QFileDialog
+from PySide6.QtGui import QDesktopServices
+from qasync import asyncSlot
 from utils import prettify_date
-from plugin_manager import PluginManager
-from state_manager import State
 from loguru import logger
 from dialogs import SearchDialog
+from workspace import Workspace
+import pixmap_cache
+from plugin_list_model import PluginListModel, PluginFilterProxy, PluginDelegate, PluginRole, SortNameRole, SortDateRole
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Emitted once, right after the window has painted for the first time
+    painted = Signal()
+
+    def __init__(self, plugin_manager):
         super().__init__()
         self.setWindowTitle("Paper Server Manager")
         self.setMinimumSize(800, 600)
@@ -22,8 +25,40 @@ class MainWindow(QMainWindow):
         self.central_widget = QWidget()
         self.layout = QVBoxLayout(self.central_widget)
 
-        self.plugin_list = QListWidget()
-        self.plugin_list.itemClicked.connect(self.display_plugin_info)
+        self.plugin_model = PluginListModel(self)
+        self.plugin_proxy = PluginFilterProxy(self)
+        self.plugin_proxy.setSourceModel(self.plugin_model)
+        self.plugin_proxy.sort(0)
+
+        # Rows are painted by the delegate; uniform sizes let the view lay out only what is visible
+        self.plugin_list = QListView()
+        self.plugin_list.setModel(self.plugin_proxy)
+        self.plugin_list.setItemDelegate(PluginDelegate(self.plugin_list))
+        self.plugin_list.setUniformItemSizes(True)
+        self.plugin_list.setLayoutMode(QListView.Batched)
+        self.plugin_list.setBatchSize(200)
+        self.plugin_list.clicked.connect(self.display_plugin_info)
+        self.plugin_list.doubleClicked.connect(self.open_plugin_page)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter plugins...")
+        self.filter_input.textChanged.connect(self.plugin_proxy.setFilterFixedString)
+
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItem("Name", SortNameRole)
+        self.sort_combo.addItem("Date Modified", SortDateRole)
+        self.sort_combo.currentIndexChanged.connect(self.sort_plugins)
+
+        # "All servers" shows each distinct plugin once; picking a server shows that server's jars
+        self.server_combo = QComboBox()
+        self.server_combo.addItem("All servers", None)
+        self.server_combo.currentIndexChanged.connect(self.show_view)
+
+        self.add_server_button = QPushButton("Add Server...")
+        self.add_server_button.clicked.connect(self.add_server)
+
+        self.remove_server_button = QPushButton("Remove Server")
+        self.remove_server_button.clicked.connect(self.remove_server)
 
         self.check_updates_button = QPushButton("Check for Updates")
         self.check_updates_button.clicked.connect(self.check_updates)
@@ -34,16 +69,45 @@ class MainWindow(QMainWindow):
         self.search_plugins_button = QPushButton("Search Plugins")
         self.search_plugins_button.clicked.connect(self.search_plugins)
 
+        self.rescan_button = QPushButton("Rescan Plugins")
+        self.rescan_button.clicked.connect(self.start_scan)
+
+        self.cancel_scan_button = QPushButton("Cancel Scan")
+        self.cancel_scan_button.clicked.connect(self.cancel_scan)
+        self.cancel_scan_button.setEnabled(False)
+
+        self.scan_progress = QProgressBar()
+        self.scan_progress.setFormat("%v / %m plugins")
+        self.scan_progress.setVisible(False)
+        self.scan_task = None
+        # Icons are decoded on worker threads in batches; rows paint a placeholder until theirs is ready
+        self.pending_icons = set()
+        self.icon_task = None
+
         self.info_box = QScrollArea()
         self.info_box.setWidgetResizable(True)
 
         self.button_layout = QVBoxLayout()
+        self.button_layout.addWidget(self.add_server_button)
+        self.button_layout.addWidget(self.remove_server_button)
         self.button_layout.addWidget(self.check_updates_button)
         self.button_layout.addWidget(self.remove_plugin_button)
         self.button_layout.addWidget(self.search_plugins_button)
+        self.button_layout.addWidget(self.rescan_button)
+        self.button_layout.addWidget(self.cancel_scan_button)
+        self.button_layout.addStretch()
+        self.button_layout.addWidget(self.scan_progress)
+
+        self.list_layout = QVBoxLayout()
+        self.filter_layout = QHBoxLayout()
+        self.filter_layout.addWidget(self.server_combo)
+        self.filter_layout.addWidget(self.filter_input)
+        self.filter_layout.addWidget(self.sort_combo)
+        self.list_layout.addLayout(self.filter_layout)
+        self.list_layout.addWidget(self.plugin_list)
 
         self.main_layout = QHBoxLayout()
-        self.main_layout.addWidget(self.plugin_list)
+        self.main_layout.addLayout(self.list_layout)
         self.main_layout.addLayout(self.button_layout)
 
         self.layout.addLayout(self.main_layout)
@@ -51,45 +115,175 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(self.central_widget)
 
-        self.state = State()
-        self.plugin_manager = PluginManager()
-        self.state.set_plugin_folder(self.state.get_plugin_folder())
-        logger.info(f"Plugin folder set to: {self.state.get_plugin_folder()}")
-
-        asyncio.run_coroutine_threadsafe(self.load_plugins(), asyncio.get_event_loop())
+        # One manager and state are shared by the whole app; the workspace holds the state of every server
+        self.plugin_manager = plugin_manager
+        self.state = plugin_manager.state
+        self.workspace = Workspace(plugin_manager)
+        self.updates = []
+        pixmap_cache.configure(self.plugin_manager.config.get('icons'))
+
+        # The saved state and the first scan wait until the window is on screen
+        self.first_paint_done = False
+        self.painted.connect(self.start_initial_scan)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            QTimer.singleShot(0, self.painted.emit)
+
+    def start_initial_scan(self):
+        self.cancel_scan()
+        self.scan_task = asyncio.ensure_future(self.initial_scan(), loop=asyncio.get_event_loop())
+
+    async def initial_scan(self):
+        # Loading the saved servers is a blocking Redis round-trip, so it runs on a worker thread
+        await asyncio.to_thread(self.workspace.load)
+        self.update_server_combo()
+        await self.load_plugins()
+
+    def start_scan(self):
+        self.cancel_scan()
+        self.scan_task = asyncio.ensure_future(self.load_plugins(), loop=asyncio.get_event_loop())
+
+    def cancel_scan(self):
+        if self.scan_task is not None and not self.scan_task.done():
+            self.scan_task.cancel()
+
+    async def shutdown(self):
+        # A scan still running must not outlive the widgets it updates
+        self.cancel_scan()
+        if self.icon_task is not None:
+            self.icon_task.cancel()
+        await asyncio.gather(*[task for task in (self.scan_task, self.icon_task) if task is not None],
+                             return_exceptions=True)
+        await self.plugin_manager.aclose()
 
     async def load_plugins(self):
+        # Rows of the current view are inserted or updated as each plugin resolves; once every server is scanned
+        # the view is rebuilt from the workspace, which also drops the rows of jars that disappeared
+        state = self.plugin_manager.state
+        state.set_loading(True)
+        self.cancel_scan_button.setEnabled(True)
+        self.scan_progress.setValue(0)
+        self.scan_progress.setVisible(True)
+        done = 0
         try:
-            found_plugins, not_found_plugins = await self.plugin_manager.load_plugins()
-            self.plugin_list.clear()
-            for plugin in found_plugins:
-                item = QListWidgetItem(self.plugin_list)
-                widget = self.create_plugin_list_item(plugin)
-                item.setSizeHint(widget.sizeHint())
-                item.setData(Qt.UserRole, plugin)
-                self.plugin_list.setItemWidget(item, widget)
-
-            for plugin_name, plugin_version in not_found_plugins:
-                item = QListWidgetItem(self.plugin_list)
-                widget = self.create_not_found_plugin_list_item(plugin_name, plugin_version)
-                item.setSizeHint(widget.sizeHint())
-                self.plugin_list.setItemWidget(item, widget)
+            async with aclosing(self.workspace.iter_scan()) as events:
+                async for event in events:
+                    plugin = event['plugin']
+                    done = event['done']
+                    server = self.server_combo.currentData()
+                    found = event['status'] in ("found", "icon")
+                    if found:
+                        # Every server's icons are preloaded, so switching views never decodes on the GUI thread
+                        self.queue_icons([plugin[5]])
+                    if server is None or event['server'] == server:
+                        # An "icon" event updates the row its "found" event added
+                        if found:
+                            self.plugin_model.add_found(plugin)
+                        else:
+                            self.plugin_model.add_not_found(plugin)
+                    self.scan_progress.setMaximum(event['total'])
+                    self.scan_progress.setValue(event['done'])
+            self.updates = []
+            self.show_view()
+        except asyncio.CancelledError:
+            logger.info(f"Plugin scan cancelled after {done} plugins")
+            raise
         except Exception as e:
             logger.error(f"Error loading plugins: {e}")
+        finally:
+            state.set_loading(False)
+            self.cancel_scan_button.setEnabled(False)
+            self.scan_progress.setVisible(False)
+
+    def update_server_combo(self):
+        current = self.server_combo.currentData()
+        self.server_combo.blockSignals(True)
+        self.server_combo.clear()
+        self.server_combo.addItem("All servers", None)
+        for name in self.workspace.servers:
+            self.server_combo.addItem(name, name)
+        self.server_combo.setCurrentIndex(max(self.server_combo.findData(current), 0))
+        self.server_combo.blockSignals(False)
+        self.remove_server_button.setEnabled(self.server_combo.currentData() is not None)
+
+    def show_view(self):
+        server = self.server_combo.currentData()
+        self.remove_server_button.setEnabled(server is not None)
+        if server is None:
+            found_plugins, not_found_plugins, _ = self.workspace.aggregate_view()
+        else:
+            found_plugins, not_found_plugins = self.workspace.server_view(server)
+        self.plugin_model.set_plugins(found_plugins, not_found_plugins)
+        self.queue_icons(self.plugin_model.image_filepaths())
+        for update in self.updates:
+            if server is None or update['server'] == server:
+                self.plugin_model.set_update(update['plugin_name'], update)
+
+    def queue_icons(self, image_filepaths):
+        self.pending_icons.update(path for path in image_filepaths if path)
+        if self.pending_icons and (self.icon_task is None or self.icon_task.done()):
+            self.icon_task = asyncio.ensure_future(self.preload_icons())
+
+    async def preload_icons(self):
+        # Icons queued while a batch decodes go in the next batch
+        try:
+            while self.pending_icons:
+                image_filepaths = list(self.pending_icons)
+                self.pending_icons.clear()
+                await pixmap_cache.preload(image_filepaths)
+                self.plugin_model.icons_loaded(image_filepaths)
+        except Exception as e:
+            logger.error(f"Error preloading icons: {e}")
+
+    @asyncSlot()
+    async def add_server(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select a server's plugin folder")
+        if not folder:
+            return
+        if self.workspace.server_for_folder(folder):
+            self.show_error_message("Error", f"'{folder}' is already in the workspace")
+            return
+        name = self.workspace.add_server(folder)
+        await asyncio.to_thread(self.workspace.save)
+        self.update_server_combo()
+        self.server_combo.setCurrentIndex(self.server_combo.findData(name))
+        self.start_scan()
+
+    @asyncSlot()
+    async def remove_server(self):
+        server = self.server_combo.currentData()
+        if server is None:
+            return
+        self.cancel_scan()
+        self.workspace.remove_server(server)
+        self.updates = [update for update in self.updates if update['server'] != server]
+        await asyncio.to_thread(self.workspace.save)
+        self.update_server_combo()
+        self.show_view()
 
     @asyncSlot()
     async def check_updates(self):
         try:
-            updates = await self.plugin_manager.check_for_updates(self.state.found_plugins)
-            for plugin_name, current_version, latest_version, latest_version_date in updates:
-                item = QListWidgetItem(
-                    f"Update available for {plugin_name}: {current_version} -> {latest_version} ({prettify_date(latest_version_date)})")
-                self.plugin_list.addItem(item)
+            self.updates = await self.workspace.check_for_updates()
+            self.show_view()
         except Exception as e:
             logger.error(f"Error checking updates: {e}")
 
-    def display_plugin_info(self, item):
-        plugin = item.data(Qt.UserRole)
+    def sort_plugins(self):
+        self.plugin_proxy.setSortRole(self.sort_combo.currentData())
+        self.plugin_proxy.sort(0, Qt.AscendingOrder if self.sort_combo.currentData() == SortNameRole
+                               else Qt.DescendingOrder)
+
+    def open_plugin_page(self, index):
+        plugin = index.data(PluginRole)
+        if plugin and plugin[3]:
+            QDesktopServices.openUrl(QUrl(plugin[3]))
+
+    def display_plugin_info(self, index):
+        plugin = index.data(PluginRole)
         if plugin:
             plugin_name, date_modified, mod_name, project_id, plugin_data, image_filepath = plugin
             author = plugin_data.get('author', 'Unknown Author')
@@ -98,11 +292,11 @@ class MainWindow(QMainWindow):
             info_layout = QHBoxLayout()
 
             image_label = QLabel()
-            if image_filepath and os.path.exists(image_filepath):
-                pixmap = QPixmap(image_filepath)
+            pixmap = pixmap_cache.get_pixmap(image_filepath, 128)
+            if pixmap is not None:
                 image_label.setPixmap(pixmap)
                 image_label.setFixedSize(128, 128)
-                image_label.setScaledContents(True)
+                image_label.setAlignment(Qt.AlignCenter)
             else:
                 image_label.setText("No Image")
 
@@ -114,6 +308,9 @@ class MainWindow(QMainWindow):
 
             text_layout.addWidget(text_title)
             text_layout.addWidget(text_description)
+            if self.server_combo.currentData() is None:
+                servers = self.workspace.aggregate_view()[2].get(plugin_name, [])
+                text_layout.addWidget(QLabel(f"<p><strong>Servers:</strong> {', '.join(servers)}</p>"))
 
             info_layout.addWidget(image_label)
             info_layout.addLayout(text_layout)
@@ -124,63 +321,34 @@ class MainWindow(QMainWindow):
             self.info_box.setWidget(info_widget)
 
     def remove_plugin(self):
-        selected_items = self.plugin_list.selectedItems()
-        if selected_items:
-            item = selected_items[0]
-            plugin = item.data(Qt.UserRole)
-            plugin_name = plugin[0]
+        selected = self.plugin_list.selectionModel().selectedIndexes()
+        if selected:
+            plugin_name = self.plugin_model.key_at(self.plugin_proxy.mapToSource(selected[0]))
+            server = self.server_combo.currentData()
+            if server is None:
+                servers = self.workspace.aggregate_view()[2].get(plugin_name, [])
+                if len(servers) != 1:
+                    self.show_error_message("Error", f"'{plugin_name}' is on {len(servers)} servers; "
+                                                     "select a server to remove it from")
+                    return
+                server = servers[0]
+            state = self.workspace.servers[server]
+            record = state.get_jar_record(plugin_name)
+            jar_path = record['path'] if record else os.path.join(state.get_plugin_folder(), f"{plugin_name}.jar")
 
             try:
-                os.remove(os.path.join(self.state.get_plugin_folder(), f"{plugin_name}.jar"))
-                logger.info(f"Plugin '{plugin_name}' removed successfully")
-                self.plugin_list.takeItem(self.plugin_list.row(item))
+                os.remove(jar_path)
+                logger.info(f"Plugin '{plugin_name}' removed successfully from {server}")
+                self.workspace.forget_plugin(server, plugin_name)
+                self.show_view()
             except Exception as e:
                 logger.error(f"Error removing plugin: {e}")
                 self.show_error_message("Error", f"An error occurred while removing plugin '{plugin_name}'")
 
     def search_plugins(self):
-        search_dialog = SearchDialog(self)
-        search_dialog.exec_()
-
-    def create_plugin_list_item(self, plugin):
-        widget = QWidget()
-        layout = QHBoxLayout()
-
-        label_name = QLabel(f"<a href='{plugin[3]}' style='color: white'>{plugin[2]}</a>")
-        label_name.setOpenExternalLinks(True)
-        label_last_updated = QLabel(f"Date Modified: {prettify_date(plugin[1])}")
-
-        image_label = QLabel()
-        image_filepath = plugin[5]
-        if image_filepath and os.path.exists(image_filepath):
-            pixmap = QPixmap(image_filepath)
-            image_label.setPixmap(pixmap)
-            image_label.setFixedSize(64, 64)
-            image_label.setScaledContents(True)
-        else:
-            image_label.setText("No Image")
-
-        layout.addWidget(image_label)
-        layout.addWidget(label_name)
-        layout.addWidget(label_last_updated)
-        widget.setLayout(layout)
-
-        return widget
-
-    def create_not_found_plugin_list_item(self, plugin_name, plugin_version):
-        widget = QWidget()
-        layout = QHBoxLayout()
-
-        label_name = QLabel(f"Name: {plugin_name}")
-        label_version = QLabel(f"Version: {plugin_version}")
-        label_not_found = QLabel("Not Found")
-
-        layout.addWidget(label_name)
-        layout.addWidget(label_version)
-        layout.addWidget(label_not_found)
-        widget.setLayout(layout)
-
-        return widget
+        # Opened window-modal rather than with exec_() so searches keep running on the shared event loop
+        self.search_dialog = SearchDialog(self.plugin_manager, self)
+        self.search_dialog.open()
 
     def show_error_message(self, title, message):
         error_dialog = QMessageBox(self)
@@ -190,19 +358,5 @@ class MainWindow(QMainWindow):
         error_dialog.exec_()
 
 if __name__ == "__main__":
-    app = QAsyncApplication(sys.argv)
-    qt_material.apply_stylesheet(app, theme='dark_lightgreen.xml')
-    loop = QEventLoop(app)
-    asyncio.set_event_loop(loop)
-
-    state = State()
-    state.load_state()
-
-    plugin_manager = PluginManager()
-    plugin_manager.init_db()
-
-    main_window = MainWindow()
-    main_window.show()
-
-    with loop:
-        loop.run_forever()
+    from main import main
+    main()
@@ -0,0 +1,87 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: PluginManager
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class Catalog(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = Catalog()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsCatalog(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # Catalog
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # Catalog
+    def Entries(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            x = self._tab.Vector(o)
+            x += flatbuffers.number_types.UOffsetTFlags.py_type(j) * 4
+            x = self._tab.Indirect(x)
+            from PluginManager.CatalogEntry import CatalogEntry
+            obj = CatalogEntry()
+            obj.Init(self._tab.Bytes, x)
+            return obj
+        return None
+
+    # Catalog
+    def EntriesLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # Catalog
+    def EntriesIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        return o == 0
+
+    # Catalog
+    def Created(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.Get(flatbuffers.number_types.Float64Flags, o + self._tab.Pos)
+        return 0.0
+
+def CatalogStart(builder):
+    builder.StartObject(2)
+
+def Start(builder):
+    CatalogStart(builder)
+
+def CatalogAddEntries(builder, entries):
+    builder.PrependUOffsetTRelativeSlot(0, flatbuffers.number_types.UOffsetTFlags.py_type(entries), 0)
+
+def AddEntries(builder, entries):
+    CatalogAddEntries(builder, entries)
+
+def CatalogStartEntriesVector(builder, numElems):
+    return builder.StartVector(4, numElems, 4)
+
+def StartEntriesVector(builder, numElems):
+    return CatalogStartEntriesVector(builder, numElems)
+
+def CatalogAddCreated(builder, created):
+    builder.PrependFloat64Slot(1, created, 0.0)
+
+def AddCreated(builder, created):
+    CatalogAddCreated(builder, created)
+
+def CatalogEnd(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return CatalogEnd(builder)
@@ -0,0 +1,106 @@
+# automatically generated by the FlatBuffers compiler, do not modify
+
+# namespace: PluginManager
+
+import flatbuffers
+from flatbuffers.compat import import_numpy
+np = import_numpy()
+
+class CatalogEntry(object):
+    __slots__ = ['_tab']
+
+    @classmethod
+    def GetRootAs(cls, buf, offset=0):
+        n = flatbuffers.encode.Get(flatbuffers.packer.uoffset, buf, offset)
+        x = CatalogEntry()
+        x.Init(buf, n + offset)
+        return x
+
+    @classmethod
+    def GetRootAsCatalogEntry(cls, buf, offset=0):
+        """This method is deprecated. Please switch to GetRootAs."""
+        return cls.GetRootAs(buf, offset)
+    # CatalogEntry
+    def Init(self, buf, pos):
+        self._tab = flatbuffers.table.Table(buf, pos)
+
+    # CatalogEntry
+    def Key(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(4))
+        if o != 0:
+            return self._tab.String(o + self._tab.Pos)
+        return None
+
+    # CatalogEntry
+    def Plugin(self, j):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            a = self._tab.Vector(o)
+            return self._tab.Get(flatbuffers.number_types.Uint8Flags, a + flatbuffers.number_types.UOffsetTFlags.py_type(j * 1))
+        return 0
+
+    # CatalogEntry
+    def PluginAsNumpy(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.GetVectorAsNumpy(flatbuffers.number_types.Uint8Flags, o)
+        return 0
+
+    # CatalogEntry
+    def PluginNestedRoot(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            from PluginManager.Plugin import Plugin
+            return Plugin.GetRootAs(self._tab.Bytes, self._tab.Vector(o))
+        return 0
+
+    # CatalogEntry
+    def PluginLength(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        if o != 0:
+            return self._tab.VectorLen(o)
+        return 0
+
+    # CatalogEntry
+    def PluginIsNone(self):
+        o = flatbuffers.number_types.UOffsetTFlags.py_type(self._tab.Offset(6))
+        return o == 0
+
+def CatalogEntryStart(builder):
+    builder.StartObject(2)
+
+def Start(builder):
+    CatalogEntryStart(builder)
+
+def CatalogEntryAddKey(builder, key):
+    builder.PrependUOffsetTRelativeSlot(0, flatbuffers.number_types.UOffsetTFlags.py_type(key), 0)
+
+def AddKey(builder, key):
+    CatalogEntryAddKey(builder, key)
+
+def CatalogEntryAddPlugin(builder, plugin):
+    builder.PrependUOffsetTRelativeSlot(1, flatbuffers.number_types.UOffsetTFlags.py_type(plugin), 0)
+
+def AddPlugin(builder, plugin):
+    CatalogEntryAddPlugin(builder, plugin)
+
+def CatalogEntryStartPluginVector(builder, numElems):
+    return builder.StartVector(1, numElems, 1)
+
+def StartPluginVector(builder, numElems):
+    return CatalogEntryStartPluginVector(builder, numElems)
+
+def CatalogEntryMakePluginVectorFromBytes(builder, bytes):
+    builder.StartVector(1, len(bytes), 1)
+    builder.head = builder.head - len(bytes)
+    builder.Bytes[builder.head : builder.head + len(bytes)] = bytes
+    return builder.EndVector()
+
+def MakePluginVectorFromBytes(builder, bytes):
+    return CatalogEntryMakePluginVectorFromBytes(builder, bytes)
+
+def CatalogEntryEnd(builder):
+    return builder.EndObject()
+
+def End(builder):
+    return CatalogEntryEnd(builder)
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import argparse
+import flatbuffers
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PluginManager import Plugin as FlatbufferPlugin
+from plugin_record import PluginRecord, PluginSerializer
+
+# Compares the previous eager dict path (fresh Builder per record, every field decoded on read) with the lazy
+# PluginRecord and PluginSerializer's reused Builder and packed layout.
+# Run from the repository root: python benchmarks/bench_plugin_record.py
+
+
+def make_plugin(i):
+    return {
+        "name": f"plugin{i}",
+        "title": f"Plugin Number {i}",
+        "description": "An example plugin description that is a bit longer than the other fields. " * 3,
+        "author": f"author{i % 50}",
+        "date_created": "2021-03-04T05:06:07.000000Z",
+        "date_modified": "2024-01-02T03:04:05.000000Z",
+        "icon_url": f"https://cdn.modrinth.com/data/{i:08d}/icon.png",
+        "category": "utility",
+        "downloads": i * 31,
+        "follows": i * 7,
+        "url": f"https://modrinth.com/plugin/plugin{i}",
+        "source": "modrinth"
+    }
+
+
+def serialize_eager(plugin_data):
+    builder = flatbuffers.Builder(1024)
+    name = builder.CreateString(plugin_data['name'])
+    title = builder.CreateString(plugin_data['title'])
+    description = builder.CreateString(plugin_data['description'])
+    author = builder.CreateString(plugin_data['author'])
+    date_created = builder.CreateString(plugin_data['date_created'])
+    date_modified = builder.CreateString(plugin_data['date_modified'])
+    icon_url = builder.CreateString(plugin_data['icon_url'])
+    category = builder.CreateString(plugin_data['category'])
+    url = builder.CreateString(plugin_data['url'])
+    source = builder.CreateString(plugin_data['source'])
+    FlatbufferPlugin.PluginStart(builder)
+    FlatbufferPlugin.PluginAddName(builder, name)
+    FlatbufferPlugin.PluginAddTitle(builder, title)
+    FlatbufferPlugin.PluginAddDescription(builder, description)
+    FlatbufferPlugin.PluginAddAuthor(builder, author)
+    FlatbufferPlugin.PluginAddDateCreated(builder, date_created)
+    FlatbufferPlugin.PluginAddDateModified(builder, date_modified)
+    FlatbufferPlugin.PluginAddIconUrl(builder, icon_url)
+    FlatbufferPlugin.PluginAddCategory(builder, category)
+    FlatbufferPlugin.PluginAddDownloads(builder, plugin_data['downloads'])
+    FlatbufferPlugin.PluginAddFollows(builder, plugin_data['follows'])
+    FlatbufferPlugin.PluginAddUrl(builder, url)
+    FlatbufferPlugin.PluginAddSource(builder, source)
+    builder.Finish(FlatbufferPlugin.PluginEnd(builder))
+    return bytes(builder.Output())
+
+
+def deserialize_eager(data):
+    plugin = FlatbufferPlugin.Plugin.GetRootAsPlugin(data, 0)
+    return {
+        "name": plugin.Name().decode('utf-8'),
+        "title": plugin.Title().decode('utf-8'),
+        "description": plugin.Description().decode('utf-8'),
+        "author": plugin.Author().decode('utf-8'),
+        "date_created": plugin.DateCreated().decode('utf-8'),
+        "date_modified": plugin.DateModified().decode('utf-8'),
+        "icon_url": plugin.IconUrl().decode('utf-8'),
+        "category": plugin.Category().decode('utf-8'),
+        "downloads": plugin.Downloads(),
+        "follows": plugin.Follows(),
+        "url": plugin.Url().decode('utf-8'),
+        "source": plugin.Source().decode('utf-8')
+    }
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FlatBuffers plugin record (de)serialization")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plugins = [make_plugin(i) for i in range(args.count)]
+    serializer = PluginSerializer()
+    blobs = [serialize_eager(plugin) for plugin in plugins]
+    assert all(PluginRecord.from_bytes(packed) == plugin
+               for packed, plugin in zip(serializer.serialize_many(plugins), plugins))
+    assert all(deserialize_eager(blob) == PluginRecord.from_bytes(blob) for blob in blobs[:100])
+
+    def list_row(plugin):
+        return plugin['title'], plugin['date_modified'], plugin['icon_url']
+
+    cases = [
+        ("serialize: new Builder per record", lambda: [serialize_eager(plugin) for plugin in plugins]),
+        ("serialize: reused Builder", lambda: [serializer.serialize_with_builder(plugin) for plugin in plugins]),
+        ("serialize: PluginSerializer packed", lambda: serializer.serialize_many(plugins)),
+        ("read: eager dict, list-row fields", lambda: [list_row(deserialize_eager(blob)) for blob in blobs]),
+        ("read: PluginRecord, list-row fields",
+         lambda: [list_row(PluginRecord.from_bytes(blob)) for blob in blobs]),
+        ("read: eager dict, all fields", lambda: [dict(deserialize_eager(blob)) for blob in blobs]),
+        ("read: PluginRecord, all fields", lambda: [PluginRecord.from_bytes(blob).to_dict() for blob in blobs]),
+    ]
+    records = [PluginRecord.from_bytes(blob) for blob in blobs]
+    [list_row(record) for record in records]
+    cases.append(("read: PluginRecord, memoized re-read", lambda: [list_row(record) for record in records]))
+
+    print(f"{args.count} records, best of {args.repeat}")
+    for label, func in cases:
+        elapsed = best_of(args.repeat, func)
+        print(f"{label:<40} {elapsed * 1000:9.2f} ms  {elapsed / args.count * 1e6:7.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import zipfile
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# End-to-end scan benchmark against local stand-ins (benchmarks/standins.py) for the Modrinth and Hangar APIs and
+# Redis, so runs are repeatable and never touch the real services. For each folder size it measures a cold scan
+# (empty Redis and cache directory), a warm scan of the same folder, and a cold and warm pass of single-plugin
+# searches, each in a fresh interpreter. Reports wall time, API requests, cache hit rates and peak memory, and
+# saves the results as JSON so runs can be compared with --compare.
+# Run from the repository root: python benchmarks/bench_scan.py --sizes 10,100,1000 --latency 0.05
+
+SYLLABLES = ("ka", "lo", "mi", "ru", "te", "zan", "bel", "qui", "dor", "fen",
+             "gra", "hul", "jex", "mor", "nis", "pav", "sol", "tra", "vek", "wyn")
+PHASES = ("cold", "warm", "search-cold", "search-warm")
+DEFAULT_MIX = "hash=0.85,hangar=0.05,modrinth=0.05,unknown=0.05"
+
+
+def plugin_name(index):
+    # normalize_name drops digits, so names differ in letters: four syllables, the first varying fastest
+    parts = []
+    for _ in range(4):
+        parts.append(SYLLABLES[index % len(SYLLABLES)])
+        index //= len(SYLLABLES)
+    return "".join(parts).capitalize()
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, weight = part.split("=")
+        mix[kind.strip()] = float(weight)
+    unknown = set(mix) - {"hash", "hangar", "modrinth", "unknown"}
+    if unknown:
+        raise ValueError(f"Unknown plugin kinds in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def write_jar(path, name, index, payload_kb):
+    # Stored rather than deflated with a fixed timestamp, so the same parameters always give the same sha1
+    manifest = f"name: {name}\nversion: 1.0.{index}\nmain: bench.p{index}.Main\n"
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as jar:
+        jar.writestr(zipfile.ZipInfo("plugin.yml", (2024, 1, 1, 0, 0, 0)), manifest)
+        jar.writestr(zipfile.ZipInfo("payload.bin", (2024, 1, 1, 0, 0, 0)),
+                     random.Random(index).randbytes(payload_kb * 1024))
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build_pool(workdir, count, mix, payload_kb, seed):
+    # One pool of jars shared by every folder size; reused between runs while the parameters match
+    pool_dir = os.path.join(workdir, "jars")
+    manifest_path = os.path.join(pool_dir, "plugins.json")
+    params = {"mix": mix, "payload_kb": payload_kb, "seed": seed}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest['params'] == params and len(manifest['plugins']) >= count:
+            return manifest['plugins'][:count]
+
+    shutil.rmtree(pool_dir, ignore_errors=True)
+    os.makedirs(pool_dir)
+    kinds, weights = list(mix), list(mix.values())
+    plugins = []
+    started = time.monotonic()
+    for index in range(count):
+        name = plugin_name(index)
+        filename = f"{name}-1.0.{index}.jar"
+        sha1 = write_jar(os.path.join(pool_dir, filename), name, index, payload_kb)
+        kind = random.Random(seed * 1000003 + index).choices(kinds, weights)[0]
+        plugins.append({"index": index, "name": name, "kind": kind, "sha1": sha1, "filename": filename})
+    with open(manifest_path, 'w') as f:
+        json.dump({"params": params, "plugins": plugins}, f)
+    print(f"Wrote {count} jars to {pool_dir} in {time.monotonic() - started:.1f}s")
+    return plugins
+
+
+def build_folder(workdir, plugins):
+    # Hard links keep 10,000 jars from costing 10,000 copies; falls back to copying across filesystems
+    folder = os.path.join(workdir, str(len(plugins)), "plugins")
+    if os.path.isdir(folder) and len(os.listdir(folder)) == len(plugins):
+        return folder
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    for plugin in plugins:
+        source = os.path.join(workdir, "jars", plugin['filename'])
+        destination = os.path.join(folder, plugin['filename'])
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+    return folder
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def hit_rate(hits, lookups):
+    return round(hits / lookups, 3) if lookups else None
+
+
+def configure_child(args):
+    from config import Config
+    config = Config().config
+    for key, url in config['urls'].items():
+        config['urls'][key] = url.replace("https://api.modrinth.com", f"{args.api}/modrinth") \
+            .replace("https://hangar.papermc.io", f"{args.api}/hangar")
+    host, port = args.redis.rsplit(":", 1)
+    config['redis'] = {**config.get('redis', {}), "host": host, "port": int(port)}
+    cache_dir = os.path.join(args.workdir, str(args.size), "cache")
+    config['paths'] = {**config.get('paths', {}), "cache_dir": cache_dir,
+                       "db_path": os.path.join(cache_dir, "plugins.db"),
+                       "catalog_path": os.path.join(cache_dir, "catalog.fb")}
+    config['http'] = {**config.get('http', {}), "http2": False}
+    if args.client_rate:
+        sources = config.setdefault('scheduler', {}).setdefault('sources', {})
+        for source in ("modrinth", "hangar"):
+            sources[source] = {"rate": args.client_rate, "burst": args.client_rate}
+
+
+async def child_run(args):
+    from plugin_manager import PluginManager
+    manager = PluginManager()
+    manager.init_db()
+    result = {}
+    started = time.perf_counter()
+    try:
+        if args.phase.startswith("search"):
+            with open(os.path.join(args.workdir, "jars", "plugins.json")) as f:
+                plugins = json.load(f)['plugins'][:args.size]
+            sample = random.Random(args.seed).sample(plugins, min(args.sample, len(plugins)))
+            latencies = []
+            found = 0
+            for plugin in sample:
+                search_started = time.perf_counter()
+                results, _ = await manager.search_plugin(plugin['name'])
+                latencies.append((time.perf_counter() - search_started) * 1000)
+                found += bool(results)
+            result.update({"searches": len(sample), "found": found, "not_found": len(sample) - found,
+                           "p50_ms": round(statistics.median(latencies), 2),
+                           "p95_ms": round(sorted(latencies)[max(int(len(latencies) * 0.95) - 1, 0)], 2)})
+        else:
+            found, not_found = await manager.check_plugins(args.folder)
+            result.update({"jars": len(found) + len(not_found), "found": len(found), "not_found": len(not_found)})
+        result["wall_s"] = round(time.perf_counter() - started, 3)
+    finally:
+        await manager.aclose()
+
+    stats = manager.cache_stats()
+    hits = stats['memory']['hits'] + stats['negative']['hits'] + stats['redis']['hits'] + \
+        stats['redis']['negative_hits']
+    result["plugin_cache_hit_rate"] = hit_rate(hits, hits + stats['redis']['misses'])
+    http = manager.response_cache.stats
+    http_hits = http['fresh_hits'] + http['stale_hits'] + http['not_modified']
+    result["http_cache_hit_rate"] = hit_rate(http_hits, http_hits + http['misses'])
+    result["coalesced"] = manager.singleflight.stats['coalesced']
+    result["peak_rss_mb"] = peak_rss_mb()
+    if args.tracemalloc:
+        import tracemalloc
+        result["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    return result
+
+
+def child(args):
+    os.chdir(ROOT)
+    from loguru import logger
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    if args.tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+    configure_child(args)
+    import asyncio
+    print(json.dumps(asyncio.run(child_run(args))))
+
+
+def run_phase(args, api, redis, size, folder, phase):
+    if phase in ("cold", "search-cold"):
+        redis.data.clear()
+        shutil.rmtree(os.path.join(args.workdir, str(size), "cache"), ignore_errors=True)
+    api.reset()
+    redis.commands.clear()
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--phase", phase, "--size", str(size),
+               "--folder", folder, "--workdir", args.workdir, "--api", api.base_url,
+               "--redis", f"{redis.address[0]}:{redis.address[1]}", "--client-rate", str(args.client_rate),
+               "--sample", str(args.sample), "--seed", str(args.seed)]
+    if args.tracemalloc:
+        command.append("--tracemalloc")
+    output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=args.timeout)
+    for line in reversed(output.stdout.splitlines()):
+        if line.startswith("{"):
+            result = json.loads(line)
+            break
+    else:
+        raise RuntimeError(f"{phase} run for {size} jars failed (exit {output.returncode}):\n{output.stderr[-2000:]}")
+
+    requests = api.stats()
+    result.update({"size": size, "phase": phase, "requests": requests.get("total", 0),
+                   "api_errors": requests.get("errors", 0), "rate_limited": requests.get("rate_limited", 0),
+                   "endpoints": {endpoint: count for endpoint, count in requests.items()
+                                 if endpoint not in ("total", "errors", "rate_limited")},
+                   "redis_commands": sum(redis.commands.values())})
+    return result
+
+
+def print_table(results):
+    print(f"{'size':>6} {'phase':<12} {'wall s':>8} {'requests':>8} {'found':>6} {'plugin hit':>10} "
+          f"{'http hit':>8} {'peak MB':>8}")
+    for result in results:
+        print(f"{result['size']:>6} {result['phase']:<12} {result['wall_s']:>8.2f} {result['requests']:>8} "
+              f"{result['found']:>6} {format_rate(result['plugin_cache_hit_rate']):>10} "
+              f"{format_rate(result['http_cache_hit_rate']):>8} {result['peak_rss_mb'] or '-':>8}")
+        if "p50_ms" in result:
+            print(f"{'':>6} {'':<12} search p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms")
+
+
+def format_rate(rate):
+    return "-" if rate is None else f"{rate:.0%}"
+
+
+def print_comparison(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(result['size'], result['phase']): result for result in json.load(f)['results']}
+    print(f"\nCompared with {previous_path}")
+    for result in results:
+        before = previous.get((result['size'], result['phase']))
+        if before is None:
+            continue
+        changes = []
+        for metric in ("wall_s", "requests", "peak_rss_mb"):
+            if before.get(metric) and result.get(metric) is not None:
+                changes.append(f"{metric} {before[metric]} -> {result[metric]} "
+                               f"({(result[metric] - before[metric]) / before[metric]:+.0%})")
+        print(f"{result['size']:>6} {result['phase']:<12} {', '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold and warm folder scans against local API and "
+                                                 "Redis stand-ins")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Comma-separated jar counts")
+    parser.add_argument("--phases", default=",".join(PHASES), help="Comma-separated subset of " + ", ".join(PHASES))
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help="Share of jars identified by hash, found on Hangar or Modrinth search, or unknown")
+    parser.add_argument("--jar-kb", type=int, default=16, help="Payload size of each synthetic jar")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every API response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of API responses failing with 500")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="Requests per window per service before the stand-in answers 429; 0 disables")
+    parser.add_argument("--rate-window", type=float, default=60)
+    parser.add_argument("--client-rate", type=float, default=100,
+                        help="Scheduler requests per second per source; 0 keeps config.json's limits")
+    parser.add_argument("--sample", type=int, default=50, help="Plugins searched in the search phases")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds allowed for each phase")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also report the peak of Python allocations (slows the runs down)")
+    parser.add_argument("--workdir", default=os.path.join(ROOT, "cache", "bench_scan"),
+                        help="Where synthetic jars and per-size caches are kept between runs")
+    parser.add_argument("--output", help="Results file; defaults to benchmarks/results/bench_scan-<time>.json")
+    parser.add_argument("--compare", help="Earlier results file to print changes against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--phase", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--folder", help=argparse.SUPPRESS)
+    parser.add_argument("--api", help=argparse.SUPPRESS)
+    parser.add_argument("--redis", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.workdir = os.path.abspath(args.workdir)
+
+    if args.child:
+        child(args)
+        return 0
+
+    from standins import SyntheticPlugins, StandInAPI, RedisStandIn
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    phases = [phase.strip() for phase in args.phases.split(",")]
+    if set(phases) - set(PHASES):
+        parser.error(f"--phases must be a subset of {', '.join(PHASES)}")
+    mix = parse_mix(args.mix)
+    plugins = build_pool(args.workdir, sizes[-1], mix, args.jar_kb, args.seed)
+
+    api = StandInAPI(SyntheticPlugins(plugins), latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, rate_limit=args.rate_limit, rate_window=args.rate_window,
+                     seed=args.seed).start()
+    redis = RedisStandIn().start()
+    results = []
+    try:
+        for size in sizes:
+            folder = build_folder(args.workdir, plugins[:size])
+            for phase in phases:
+                result = run_phase(args, api, redis, size, folder, phase)
+                results.append(result)
+                print(f"{size} jars, {phase}: {result['wall_s']:.2f}s, {result['requests']} requests")
+    finally:
+        api.stop()
+        redis.stop()
+
+    print()
+    print_table(results)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results",
+                                         f"bench_scan-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    meta = {"date": time.strftime('%Y-%m-%dT%H:%M:%S'), "python": sys.version.split()[0], "platform": sys.platform,
+            **{key: value for key, value in vars(args).items() if key not in
+               ("child", "phase", "size", "folder", "api", "redis", "output", "compare")}}
+    with open(output, 'w') as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measures application startup in fresh interpreters: how long importing main takes, and how long until the main
+# window has painted for the first time (and, for information, until the deferred theme has been applied). Exits
+# with status 1 when a median exceeds --max-import-ms / --max-window-ms, or regresses by more than --tolerance
+# against a baseline written earlier with --save-baseline.
+# Run from the repository root: python benchmarks/bench_startup.py --runs 7 --baseline cache/startup.json
+
+
+def child():
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import main
+    imported = time.perf_counter()
+
+    from PySide6.QtCore import QObject, QEvent
+    timings = {"import_ms": (imported - started) * 1000}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and "first_window_ms" not in timings:
+                timings["first_window_ms"] = (time.perf_counter() - started) * 1000
+            return False
+
+    app, loop = main.create_application(sys.argv[:1])
+    main_window = main.create_main_window(app)
+    first_paint = FirstPaint()
+    main_window.installEventFilter(first_paint)
+
+    def painted():
+        # Connected last, so the theme has been applied and the initial scan started by the time this runs
+        timings["themed_ms"] = (time.perf_counter() - started) * 1000
+        loop.stop()
+
+    main_window.painted.connect(painted)
+    main_window.show()
+    with loop:
+        loop.run_forever()
+        loop.run_until_complete(main_window.shutdown())
+    print(json.dumps(timings))
+
+
+def run_once(platform):
+    env = dict(os.environ)
+    if platform:
+        env["QT_QPA_PLATFORM"] = platform
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    for line in reversed(output.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"Startup run failed (exit {output.returncode}):\n{output.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application import time and time to first window")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--platform", default="offscreen",
+                        help="QT_QPA_PLATFORM for the runs; pass an empty string to use the real display")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-window-ms", type=float)
+    parser.add_argument("--baseline", help="JSON file of earlier medians to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline")
+    parser.add_argument("--save-baseline", help="Write this run's medians to a JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return 0
+
+    # One discarded run warms the OS file cache and writes the .pyc files
+    run_once(args.platform)
+    runs = [run_once(args.platform) for _ in range(args.runs)]
+    medians = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+    print(f"{args.runs} runs, platform {args.platform or 'default'}")
+    for metric, value in medians.items():
+        spread = [run[metric] for run in runs]
+        print(f"{metric:<16} median {value:8.1f} ms  min {min(spread):8.1f} ms  max {max(spread):8.1f} ms")
+
+    failures = []
+    if args.max_import_ms is not None and medians["import_ms"] > args.max_import_ms:
+        failures.append(f"import_ms {medians['import_ms']:.1f} exceeds {args.max_import_ms:.1f}")
+    if args.max_window_ms is not None and medians["first_window_ms"] > args.max_window_ms:
+        failures.append(f"first_window_ms {medians['first_window_ms']:.1f} exceeds {args.max_window_ms:.1f}")
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for metric in ("import_ms", "first_window_ms"):
+            if metric in baseline and medians[metric] > baseline[metric] * (1 + args.tolerance):
+                failures.append(f"{metric} {medians[metric]:.1f} regressed from {baseline[metric]:.1f} "
+                                f"(tolerance {args.tolerance:.0%})")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(medians, f, indent=2)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+import os
+import sys
+import json
+import time
+import base64
+import random
+import threading
+import socketserver
+from collections import Counter
+from difflib import SequenceMatcher
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import normalize_name
+
+# Local stand-ins for the services a scan talks to, for benchmarks/bench_scan.py. StandInAPI serves the Modrinth
+# and Hangar endpoints used by check_plugins and search_plugin under /modrinth/v2 and /hangar/api/v1, counting
+# requests per endpoint; RedisStandIn speaks just enough of the Redis protocol for the app. Both run on background
+# threads of the calling process, so the code being measured talks to them over real sockets.
+
+NEIGHBOUR_SIMILARITY = 0.75
+
+
+class SyntheticPlugins:
+    # The projects the stand-in APIs know about. Each entry is a dict with "index", "name", "kind" (hash, hangar,
+    # modrinth or unknown) and, for hash entries, the jar's "sha1"
+    def __init__(self, plugins):
+        self.plugins = plugins
+        self.by_sha1 = {plugin['sha1']: plugin for plugin in plugins if plugin['kind'] == "hash"}
+        self.by_project = {f"P{plugin['index']}": plugin for plugin in plugins if plugin['kind'] == "hash"}
+        self.hangar = self._index("hangar")
+        self.modrinth = self._index("modrinth", "hash")
+
+    def _index(self, *kinds):
+        # Search hits are the exact name plus a few neighbours sharing its first letters, like a real index
+        index = {}
+        for plugin in self.plugins:
+            if plugin['kind'] in kinds:
+                index.setdefault(normalize_name(plugin['name'])[:4], []).append(plugin)
+        return index
+
+    def search(self, index, query, limit):
+        # Neighbours stay below the app's match threshold, so only the plugin's kind decides whether it is found
+        # and the counts do not change with the size of the synthetic set
+        query = normalize_name(query)
+        matcher = SequenceMatcher(None)
+        matcher.set_seq2(query)
+        exact, others = [], []
+        for plugin in index.get(query[:4], []):
+            name = normalize_name(plugin['name'])
+            matcher.set_seq1(name)
+            if name == query:
+                exact.append(plugin)
+            elif matcher.ratio() < NEIGHBOUR_SIMILARITY:
+                others.append(plugin)
+        return (exact + others)[:limit]
+
+
+def modrinth_hit(plugin):
+    return {"title": plugin['name'], "slug": plugin['name'].lower(), "author": f"author{plugin['index'] % 97}",
+            "description": f"Synthetic plugin {plugin['index']}", "categories": ["utility"], "icon_url": "",
+            "downloads": plugin['index'] * 13, "follows": plugin['index'] % 500,
+            "date_created": "2022-01-01T00:00:00Z", "date_modified": "2024-01-01T00:00:00Z"}
+
+
+def modrinth_project(plugin):
+    return {"id": f"P{plugin['index']}", "title": plugin['name'], "slug": plugin['name'].lower(),
+            "team": f"T{plugin['index']}", "project_type": "plugin", "icon_url": None,
+            "description": f"Synthetic plugin {plugin['index']}", "categories": ["utility"],
+            "followers": plugin['index'] % 500, "downloads": plugin['index'] * 13,
+            "published": "2022-01-01T00:00:00Z", "updated": "2024-01-01T00:00:00Z"}
+
+
+def hangar_project(plugin):
+    return {"name": plugin['name'], "namespace": {"owner": f"author{plugin['index'] % 97}", "slug": plugin['name']},
+            "description": f"Synthetic plugin {plugin['index']}", "avatarUrl": "", "category": "admin_tools",
+            "stats": {"downloads": plugin['index'] * 11, "stars": plugin['index'] % 300},
+            "createdAt": "2022-01-01T00:00:00Z", "lastUpdated": "2024-01-01T00:00:00Z"}
+
+
+class RateWindow:
+    # Fixed-window limiter reporting X-Ratelimit-* headers the way Modrinth does
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.started = time.monotonic()
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def take(self):
+        # Returns (allowed, remaining, seconds until reset)
+        with self.lock:
+            now = time.monotonic()
+            if now - self.started >= self.window:
+                self.started = now
+                self.used = 0
+            self.used += 1
+            reset = max(self.window - (now - self.started), 0)
+            return self.used <= self.limit, max(self.limit - self.used, 0), reset
+
+
+class StandInAPI:
+    def __init__(self, plugins, latency=0.02, jitter=0.0, error_rate=0.0, rate_limit=0, rate_window=60, seed=1):
+        self.plugins = plugins
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limits = {service: RateWindow(rate_limit, rate_window) for service in ("modrinth", "hangar")} \
+            if rate_limit else {}
+        self.random = random.Random(seed)
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, Nagle and delayed ACKs add ~40ms to each
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                api.handle(self, "GET")
+
+            def do_POST(self):
+                api.handle(self, "POST")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+    def respond(self, handler, status, body=None, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b""
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def handle(self, handler, method):
+        url = urlsplit(handler.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length)) if length else None
+
+        service = url.path.split('/')[1]
+        endpoint = f"{method} {url.path}" if "/versions" not in url.path else f"{method} /{service}/versions"
+        with self.lock:
+            self.counts[endpoint] += 1
+            self.counts["total"] += 1
+            failed = self.random.random() < self.error_rate
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        headers = {}
+        if service in self.limits:
+            allowed, remaining, reset = self.limits[service].take()
+            headers = {"X-Ratelimit-Limit": str(self.limits[service].limit), "X-Ratelimit-Remaining": str(remaining),
+                       "X-Ratelimit-Reset": str(int(reset) + 1)}
+            if not allowed:
+                with self.lock:
+                    self.counts["rate_limited"] += 1
+                return self.respond(handler, 429, {"error": "ratelimited"}, headers)
+        if failed:
+            with self.lock:
+                self.counts["errors"] += 1
+            return self.respond(handler, 500, {"error": "injected failure"}, headers)
+
+        status, result = self.route(method, url.path, query, body)
+        return self.respond(handler, status, result, headers)
+
+    def route(self, method, path, query, body):
+        plugins = self.plugins
+        if path == "/modrinth/v2/search":
+            hits = plugins.search(plugins.modrinth, query.get("query", ""), int(query.get("limit", 10)))
+            return 200, {"hits": [modrinth_hit(plugin) for plugin in hits], "total_hits": len(hits)}
+        if path == "/modrinth/v2/version_files" and method == "POST":
+            versions = {}
+            for file_hash in body.get("hashes", []):
+                plugin = plugins.by_sha1.get(file_hash)
+                if plugin:
+                    versions[file_hash] = {"project_id": f"P{plugin['index']}", "version_number": "1.0.0",
+                                           "files": [{"hashes": {"sha1": file_hash}, "primary": True}]}
+            return 200, versions
+        if path == "/modrinth/v2/projects":
+            return 200, [modrinth_project(plugins.by_project[project_id]) for project_id in
+                         json.loads(query.get("ids", "[]")) if project_id in plugins.by_project]
+        if path == "/modrinth/v2/teams":
+            return 200, [[{"team_id": team_id, "role": "Owner", "user": {"username": f"owner{team_id[1:]}"}}]
+                         for team_id in json.loads(query.get("ids", "[]"))]
+        if path == "/hangar/api/v1/authenticate" and method == "POST":
+            claims = base64.urlsafe_b64encode(json.dumps({"exp": time.time() + 3600}).encode()).decode().rstrip("=")
+            return 200, {"token": f"standin.{claims}.signature", "expiresIn": 3600}
+        if path == "/hangar/api/v1/projects":
+            hits = plugins.search(plugins.hangar, query.get("q", ""), int(query.get("limit", 10)))
+            return 200, {"result": [hangar_project(plugin) for plugin in hits],
+                         "pagination": {"count": len(hits), "limit": int(query.get("limit", 10)), "offset": 0}}
+        return 404, {"error": "not found"}
+
+
+class RedisStandIn:
+    # The Redis commands the app uses: GET, SET with EX/PX, MGET, DEL, FLUSHDB, PING, HELLO, SELECT and CLIENT, in
+    # RESP2 or RESP3 as each connection asks. Expired keys are dropped when read. Pipelines are just several
+    # commands written back to back
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+        self.commands = Counter()
+        self.server = None
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def start(self):
+        redis = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                session = {"protocol": 2}
+                while True:
+                    command = redis.read_command(self.rfile)
+                    if command is None:
+                        return
+                    self.wfile.write(redis.execute(command, session))
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    @staticmethod
+    def read_command(stream):
+        line = stream.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        arguments = []
+        for _ in range(int(line[1:])):
+            length = int(stream.readline()[1:])
+            arguments.append(stream.read(length + 2)[:-2])
+        return arguments
+
+    @staticmethod
+    def bulk(value, protocol=2):
+        if value is None:
+            return b"_\r\n" if protocol == 3 else b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, command, session):
+        name = command[0].upper().decode()
+        arguments = command[1:]
+        protocol = session['protocol']
+        with self.lock:
+            self.commands[name] += 1
+            if name == "PING":
+                return b"+PONG\r\n"
+            if name in ("SELECT", "CLIENT"):
+                return b"+OK\r\n"
+            if name == "HELLO":
+                protocol = session['protocol'] = int(arguments[0]) if arguments else protocol
+                fields = [(b"server", self.bulk(b"redis")), (b"version", self.bulk(b"7.0.0")),
+                          (b"proto", b":%d\r\n" % protocol), (b"mode", self.bulk(b"standalone"))]
+                header = b"%%%d\r\n" % len(fields) if protocol == 3 else b"*%d\r\n" % (len(fields) * 2)
+                return header + b"".join(self.bulk(field) + value for field, value in fields)
+            if name == "GET":
+                return self.bulk(self._get(arguments[0]), protocol)
+            if name == "MGET":
+                values = [self.bulk(self._get(key), protocol) for key in arguments]
+                return b"*%d\r\n" % len(values) + b"".join(values)
+            if name == "SET":
+                expires = None
+                options = [option.upper() for option in arguments[2:]]
+                if b"EX" in options:
+                    expires = time.monotonic() + int(arguments[2 + options.index(b"EX") + 1])
+                elif b"PX" in options:
+                    expires = time.monotonic() + int(arguments[2 + options.index(b"PX") + 1]) / 1000
+                self.data[arguments[0]] = (arguments[1], expires)
+                return b"+OK\r\n"
+            if name == "DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in arguments)
+                return b":%d\r\n" % removed
+            if name == "FLUSHDB":
+                self.data.clear()
+                return b"+OK\r\n"
+            if name == "DBSIZE":
+                return b":%d\r\n" % len(self.data)
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
@@ -0,0 +1,151 @@
+import time
+from collections import OrderedDict
+from loguru import logger
+from metrics import metrics
+
+DEFAULT_CACHE_CONFIG = {
+    "memory_max_entries": 4096,
+    "memory_ttl": 600,
+    "negative_ttl": 3600,
+    "negative_memory_ttl": 600
+}
+
+
+class LRUTTLCache:
+    def __init__(self, max_entries=1024, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+        self.misses += 1
+        return default
+
+    def set(self, key, value, ttl=None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class PluginCache:
+    # In-process LRU+TTL tier in front of Redis, plus a shorter-lived negative cache for plugins
+    # that matched on neither source
+    PLUGIN_PREFIX = "plugin:"
+    MISS_PREFIX = "plugin_miss:"
+
+    def __init__(self, redis_client, serialize, deserialize, cache_config=None):
+        self.redis_client = redis_client
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.cache_config = {**DEFAULT_CACHE_CONFIG, **(cache_config or {})}
+        self.memory = LRUTTLCache(self.cache_config['memory_max_entries'], self.cache_config['memory_ttl'])
+        self.negative = LRUTTLCache(self.cache_config['memory_max_entries'],
+                                    self.cache_config['negative_memory_ttl'])
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_negative_hits = 0
+
+    async def get_many(self, names):
+        # Returns (found, not_found): plugin data by name, and the names known to have no match
+        found = {}
+        not_found = set()
+        remaining = []
+        for name in dict.fromkeys(names):
+            plugin_data = self.memory.get(name)
+            if plugin_data is not None:
+                found[name] = plugin_data
+            elif self.negative.get(name) is not None:
+                not_found.add(name)
+            else:
+                remaining.append(name)
+
+        if remaining:
+            # Positive and negative keys for every remaining name in a single MGET
+            keys = [self.PLUGIN_PREFIX + name for name in remaining] + [self.MISS_PREFIX + name for name in remaining]
+            with metrics.span("redis", op="mget"):
+                values = await self.redis_client.mget(keys)
+            plugin_values, miss_values = values[:len(remaining)], values[len(remaining):]
+            for name, value, miss in zip(remaining, plugin_values, miss_values):
+                if value:
+                    self.redis_hits += 1
+                    try:
+                        plugin_data = self.deserialize(value)
+                    except Exception as e:
+                        logger.error(f"Error decoding cached plugin {name}: {e}")
+                        continue
+                    self.memory.set(name, plugin_data)
+                    found[name] = plugin_data
+                elif miss:
+                    self.redis_negative_hits += 1
+                    self.negative.set(name, True)
+                    not_found.add(name)
+                else:
+                    self.redis_misses += 1
+        return found, not_found
+
+    async def get(self, name):
+        found, not_found = await self.get_many([name])
+        return found.get(name), name in not_found
+
+    async def set_many(self, plugins_by_name):
+        serialized = {}
+        for name, plugin_data in plugins_by_name.items():
+            data = self.serialize(plugin_data)
+            for key in dict.fromkeys((name, plugin_data['name'])):
+                serialized[self.PLUGIN_PREFIX + key] = data
+                self.memory.set(key, plugin_data)
+                self.negative.delete(key)
+        with metrics.span("redis", op="set"):
+            await self.redis_client.set_many(serialized)
+
+    async def set_not_found_many(self, names):
+        names = list(names)
+        for name in names:
+            self.negative.set(name, True)
+        with metrics.span("redis", op="set"):
+            await self.redis_client.set_many({self.MISS_PREFIX + name: b"1" for name in names},
+                                             ex=self.cache_config['negative_ttl'])
+
+    def stats(self):
+        return {
+            "memory": self.memory.stats(),
+            "negative": self.negative.stats(),
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "negative_hits": self.redis_negative_hits
+            }
+        }
@@ -0,0 +1,188 @@
+import os
+import mmap
+import time
+import struct
+import asyncio
+from loguru import logger
+from plugin_record import PluginRecord
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_F64 = struct.Struct("<d")
+
+
+class CatalogSnapshot:
+    # Memory-mapped Catalog (see plugin.fbs) of every resolved plugin, keyed by normalized name. Opening it only
+    # maps the file; a lookup is a binary search over the sorted entry vector that copies out the one matching
+    # Plugin buffer, so nothing is parsed up front and no view into the mapping outlives the call
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._entries = 0
+        self._count = 0
+        self._opened = False
+        self._lock = asyncio.Lock()
+
+    def _field(self, table, index):
+        # Absolute position of field index in table, or 0 when the field is absent
+        vtable = table - _I32.unpack_from(self._map, table)[0]
+        slot = 4 + 2 * index
+        if slot >= _U16.unpack_from(self._map, vtable)[0]:
+            return 0
+        offset = _U16.unpack_from(self._map, vtable + slot)[0]
+        return table + offset if offset else 0
+
+    def _vector(self, field):
+        # (start of data, length) of the vector or string referenced at field
+        position = field + _U32.unpack_from(self._map, field)[0]
+        return position + 4, _U32.unpack_from(self._map, position)[0]
+
+    def open(self):
+        if self._opened:
+            return self._map is not None
+        self._opened = True
+        try:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) < 8:
+                return False
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            root = _U32.unpack_from(self._map, 0)[0]
+            entries = self._field(root, 0)
+            self._entries, self._count = self._vector(entries) if entries else (0, 0)
+            created = self._field(root, 1)
+            age = time.time() - _F64.unpack_from(self._map, created)[0] if created else 0
+            logger.info(f"Catalog snapshot opened with {self._count} plugins, {age / 3600:.1f}h old")
+            return True
+        except Exception as e:
+            logger.error(f"Error opening catalog snapshot {self.path}: {e}")
+            self.close()
+            self._opened = True
+            return False
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = None
+        self._file = None
+        self._entries = self._count = 0
+        self._opened = False
+
+    def __len__(self):
+        return self._count if self.open() else 0
+
+    def _entry(self, index):
+        element = self._entries + 4 * index
+        return element + _U32.unpack_from(self._map, element)[0]
+
+    def _key(self, entry):
+        start, length = self._vector(self._field(entry, 0))
+        return self._map[start:start + length]
+
+    def get_bytes(self, name):
+        if not self.open():
+            return None
+        key = name.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            entry_key = self._key(entry)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle
+            else:
+                field = self._field(entry, 1)
+                if not field:
+                    return None
+                start, length = self._vector(field)
+                return self._map[start:start + length]
+        return None
+
+    def items_bytes(self):
+        # (encoded key, Plugin buffer) of every entry, copied out of the mapping
+        if not self.open():
+            return {}
+        items = {}
+        try:
+            for index in range(self._count):
+                entry = self._entry(index)
+                field = self._field(entry, 1)
+                if field:
+                    start, length = self._vector(field)
+                    items[bytes(self._key(entry))] = self._map[start:start + length]
+        except Exception as e:
+            logger.error(f"Error reading catalog snapshot: {e}")
+        return items
+
+    def get_many(self, names):
+        found = {}
+        try:
+            for name in dict.fromkeys(names):
+                data = self.get_bytes(name)
+                if data:
+                    found[name] = PluginRecord.from_bytes(data)
+        except Exception as e:
+            logger.error(f"Error reading catalog snapshot: {e}")
+        return found
+
+    @staticmethod
+    def build(blobs_by_key, created=None):
+        # blobs_by_key maps encoded keys to serialized Plugin buffers; entries are written in key order. Reading
+        # never needs the flatbuffers package, so only writing imports it
+        import flatbuffers
+        from PluginManager import Catalog as FlatbufferCatalog
+        from PluginManager import CatalogEntry as FlatbufferCatalogEntry
+        builder = flatbuffers.Builder(sum(len(key) + len(blob) + 32 for key, blob in blobs_by_key.items()) + 64)
+        entries = []
+        for key, blob in sorted(blobs_by_key.items()):
+            key_offset = builder.CreateString(key)
+            # Nested Plugin buffers keep 4-byte alignment so they can be read in place as well as copied out
+            builder.StartVector(1, len(blob), 4)
+            builder.head = builder.head - len(blob)
+            builder.Bytes[builder.head:builder.head + len(blob)] = blob
+            plugin_offset = builder.EndVector()
+            FlatbufferCatalogEntry.CatalogEntryStart(builder)
+            FlatbufferCatalogEntry.CatalogEntryAddKey(builder, key_offset)
+            FlatbufferCatalogEntry.CatalogEntryAddPlugin(builder, plugin_offset)
+            entries.append(FlatbufferCatalogEntry.CatalogEntryEnd(builder))
+
+        FlatbufferCatalog.CatalogStartEntriesVector(builder, len(entries))
+        for entry in reversed(entries):
+            builder.PrependUOffsetTRelative(entry)
+        entries_offset = builder.EndVector()
+        FlatbufferCatalog.CatalogStart(builder)
+        FlatbufferCatalog.CatalogAddEntries(builder, entries_offset)
+        FlatbufferCatalog.CatalogAddCreated(builder, created if created is not None else time.time())
+        builder.Finish(FlatbufferCatalog.CatalogEnd(builder))
+        return bytes(builder.Output())
+
+    def _write_temp(self, data):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return temp_path
+
+    async def save(self, plugins_by_name, serialize):
+        # Merged into the entries already in the snapshot, so a scan of some folders keeps what other folders
+        # resolved; rebuilt off the event loop and swapped in atomically, readers see either the old or the new one
+        updates = {name.encode('utf-8'): serialize(plugin_data) for name, plugin_data in plugins_by_name.items()}
+        async with self._lock:
+            try:
+                blobs = await asyncio.to_thread(self.items_bytes)
+                blobs.update(updates)
+                data = await asyncio.to_thread(self.build, blobs)
+                temp_path = await asyncio.to_thread(self._write_temp, data)
+                # Windows will not replace a file that is still mapped
+                self.close()
+                os.replace(temp_path, self.path)
+                logger.info(f"Catalog snapshot written with {len(blobs)} plugins ({len(data)} bytes)")
+            except Exception as e:
+                logger.error(f"Error writing catalog snapshot: {e}")
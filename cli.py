@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from contextlib import aclosing
+from loguru import logger
+
+from config import Config
+from logging_config import configure_logging
+from plugin_manager import PluginManager
+from plugin_store import SORT_ORDERS
+from workspace import Workspace
+from metrics import metrics
+
+# Headless entry point for servers and cron; nothing here imports PySide6 or qt_material.
+# Run from the application directory, like main.py: python cli.py scan /srv/lobby/plugins /srv/survival/plugins
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_UPDATES_AVAILABLE = 3
+
+
+class Output:
+    # NDJSON writes each object on its own line as soon as it is produced; JSON collects them into one array
+    def __init__(self, output_format, stream=None):
+        self.output_format = output_format
+        self.stream = stream or sys.stdout
+        self.items = []
+
+    def emit(self, item):
+        if self.output_format == "ndjson":
+            self.stream.write(json.dumps(item, default=str) + "\n")
+            self.stream.flush()
+        else:
+            self.items.append(item)
+
+    def close(self):
+        if self.output_format == "json":
+            json.dump(self.items, self.stream, indent=2, default=str)
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def plugin_event(workspace, event):
+    plugin = event['plugin']
+    state = workspace.servers[event['server']]
+    record = state.get_jar_record(plugin[0]) or {}
+    item = {"event": "plugin", "status": event['status'], "server": event['server'],
+            "folder": state.get_plugin_folder(), "plugin_name": plugin[0], "path": record.get('path'),
+            "version": record.get('version'), "done": event['done'], "total": event['total']}
+    if event['status'] == "found":
+        plugin_data = plugin[4]
+        item.update({"title": plugin[2], "url": plugin[3], "source": plugin_data.get('source'),
+                     "author": plugin_data.get('author'), "date_modified": plugin[1]})
+    return item
+
+
+async def open_workspace(manager, args, output):
+    # Folders on the command line form the workspace for this run; without any, the saved workspace is used.
+    # Returns the workspace and whether every folder was usable
+    workspace = Workspace(manager)
+    if args.folders:
+        for folder in args.folders:
+            workspace.add_server(os.path.abspath(folder))
+    else:
+        await asyncio.to_thread(workspace.load)
+    usable = True
+    for name, folder in workspace.folders().items():
+        if not os.path.isdir(folder):
+            output.emit({"event": "error", "server": name, "folder": folder, "error": "Not a directory"})
+            workspace.remove_server(name)
+            usable = False
+    return workspace, usable
+
+
+async def scan_workspace(workspace, args, output, emit_plugins=True):
+    # All servers are scanned in one pass, so each distinct plugin is resolved once however many servers have it.
+    # Returns the number of jars whose lookup failed; those are always reported, as they are counted as not found
+    manager = workspace.plugin_manager
+    started = time.monotonic()
+    coalesced = manager.singleflight.stats['coalesced']
+    failed = {}
+    async with aclosing(workspace.iter_scan(cache_only=args.cache_only, fetch_icons=False)) as events:
+        async for event in events:
+            if event['status'] == "failed":
+                failed[event['server']] = failed.get(event['server'], 0) + 1
+            if emit_plugins or event['status'] == "failed":
+                output.emit(plugin_event(workspace, event))
+    summary = workspace.summary()
+    for name, server in summary['servers'].items():
+        output.emit({"event": "scanned", "server": name, "folder": server['folder'], "found": server['found'],
+                     "not_found": server['not_found'], "failed": failed.get(name, 0)})
+    output.emit({"event": "workspace", "servers": len(summary['servers']), "jars": summary['jars'],
+                 "distinct_found": summary['distinct_found'], "distinct_not_found": summary['distinct_not_found'],
+                 "failed": sum(failed.values()), "seconds": round(time.monotonic() - started, 3),
+                 "coalesced": manager.singleflight.stats['coalesced'] - coalesced})
+    return sum(failed.values())
+
+
+async def run_scan(manager, args, output):
+    workspace, usable = await open_workspace(manager, args, output)
+    failed = await scan_workspace(workspace, args, output) if workspace.servers else 0
+    return EXIT_OK if usable and not failed else EXIT_ERROR
+
+
+async def run_check_updates(manager, args, output):
+    workspace, usable = await open_workspace(manager, args, output)
+    status = EXIT_OK if usable else EXIT_ERROR
+    if not workspace.servers:
+        return status
+    if await scan_workspace(workspace, args, output, emit_plugins=False):
+        status = EXIT_ERROR
+    updates = await workspace.check_for_updates()
+    for failure in workspace.update_failures:
+        output.emit({"event": "check_failed", "folder": os.path.dirname(failure['path']),
+                     "plugin_name": os.path.splitext(os.path.basename(failure['path']))[0], **failure})
+        status = EXIT_ERROR
+    if args.command == "update" and args.only:
+        updates = [update for update in updates if update['plugin_name'] in args.only]
+    for update in updates:
+        output.emit({"event": "update", "folder": os.path.dirname(update['path']), **update})
+    available = sum(bool(update['update_available']) for update in updates)
+
+    if args.command == "update":
+        async with aclosing(manager.iter_updates(updates)) as results:
+            async for result in results:
+                update = result['update']
+                output.emit({"event": "updated" if result['error'] is None else "update_failed",
+                             "server": update['server'], "folder": os.path.dirname(update['path']),
+                             "plugin_name": update['plugin_name'], "version": update['latest_version'],
+                             "path": result['destination'], "error": result['error']})
+                if result['error'] is not None:
+                    status = EXIT_ERROR
+
+    if args.command == "check-updates" and status == EXIT_OK and available:
+        return EXIT_UPDATES_AVAILABLE
+    return status
+
+
+async def run_search(manager, args, output):
+    # Results are written as each source responds; the closing summary carries the final ranking
+    emitted = set()
+    event = None
+    async with aclosing(manager.iter_search(args.query, args.category, args.sort, args.limit,
+                                            remote=not args.cache_only)) as events:
+        async for event in events:
+            for plugin_data in event['results']:
+                key = (plugin_data['source'], plugin_data['name'])
+                if key not in emitted:
+                    emitted.add(key)
+                    output.emit({"event": "result", "origin": event['origin'], **dict(plugin_data)})
+    results = event['results'] if event else []
+    output.emit({"event": "searched", "query": args.query, "origin": event['origin'] if event else None,
+                 "results": len(results),
+                 "ranking": [f"{plugin_data['source']}:{plugin_data['name']}" for plugin_data in results]})
+    return EXIT_OK
+
+
+COMMANDS = {
+    "scan": run_scan,
+    "check-updates": run_check_updates,
+    "update": run_check_updates,
+    "search": run_search
+}
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=("ndjson", "json"), default="ndjson",
+                        help="ndjson streams one object per line as results arrive; json prints one array at the end")
+    common.add_argument("--concurrency", type=int, help="Maximum concurrent API requests and downloads")
+    common.add_argument("--cache-only", action="store_true",
+                        help="Only use Redis, the catalog snapshot and the local store; never touch the network")
+    common.add_argument("--metrics", action="store_true",
+                        help="Time each stage and finish with a metrics summary; scans also write cache/metrics")
+    common.add_argument("-v", "--verbose", action="store_true", help="Log progress to stderr")
+
+    parser = argparse.ArgumentParser(description="Scan, check and update server plugins without the GUI.",
+                                     epilog="exit status: 0 ok, 1 errors, 2 usage, 3 updates available "
+                                            "(check-updates)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, description in (("scan", "Identify every jar in the plugin folders"),
+                              ("check-updates", "List plugins with a newer release"),
+                              ("update", "Download and install available updates")):
+        command = commands.add_parser(name, parents=[common], help=description, description=description)
+        command.add_argument("folders", nargs="*",
+                             help="Plugin folders, one per server; defaults to the saved workspace")
+        if name == "update":
+            command.add_argument("--only", action="append", metavar="PLUGIN",
+                                 help="Only update this plugin (jar name without .jar); repeatable")
+
+    search = commands.add_parser("search", parents=[common], help="Search the local store, then Hangar and Modrinth")
+    search.add_argument("query")
+    search.add_argument("--category")
+    search.add_argument("--sort", choices=tuple(SORT_ORDERS), default="relevance")
+    search.add_argument("--limit", type=int, default=50)
+    return parser
+
+
+def apply_overrides(config, args):
+    if args.concurrency:
+        config.setdefault('scheduler', {})['max_concurrency'] = args.concurrency
+        config.setdefault('downloads', {})['concurrency'] = args.concurrency
+    if args.metrics:
+        config.setdefault('metrics', {})['enabled'] = True
+
+
+async def run(args):
+    output = Output(args.format)
+    manager = PluginManager()
+    manager.init_db()
+    checkpoint = metrics.checkpoint()
+    try:
+        return await COMMANDS[args.command](manager, args, output)
+    except Exception as e:
+        logger.error(f"Error running {args.command}: {e}")
+        output.emit({"event": "error", "error": str(e)})
+        return EXIT_ERROR
+    finally:
+        if metrics.enabled:
+            output.emit({"event": "metrics", **metrics.summary(checkpoint)})
+        output.close()
+        await manager.aclose()
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cache_only and args.command in ("check-updates", "update"):
+        parser.error(f"{args.command} needs the network and cannot run with --cache-only")
+
+    # stdout carries the results, so logs go to stderr (warnings only unless --verbose) and the log file
+    logger.remove()
+    logger.add(sys.stderr, level="INFO" if args.verbose else "WARNING")
+    configure_logging()
+
+    apply_overrides(Config().config, args)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
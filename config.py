@@ -23,5 +23,3 @@ class Config:
         except Exception as e:
             logger.error(f"Error loading configuration: {e}")
             return {}
-
-config = Config().config
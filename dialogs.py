@@ -1,21 +1,129 @@
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QPushButton
+import asyncio
+from contextlib import aclosing
+from PySide6.QtCore import Qt, QUrl, QTimer
+from PySide6.QtGui import QDesktopServices
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QComboBox, QListWidget, \
+    QListWidgetItem, QLabel
+from qasync import asyncSlot
+from loguru import logger
+
+SOURCE_LABELS = {"hangar": "Hangar", "modrinth": "Modrinth"}
+
 
 class SearchDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, plugin_manager, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Search Plugins")
+        self.setMinimumSize(600, 400)
+        self.plugin_manager = plugin_manager
+        self.search_task = None
+        self.search_key = None
 
         self.layout = QVBoxLayout()
         self.search_input = QLineEdit(self)
         self.search_input.setPlaceholderText("Enter plugin name...")
         self.search_button = QPushButton("Search", self)
 
-        self.layout.addWidget(self.search_input)
-        self.layout.addWidget(self.search_button)
+        self.category_combo = QComboBox(self)
+        self.category_combo.addItem("All categories", None)
+        self.sort_combo = QComboBox(self)
+        for label, sort in (("Relevance", "relevance"), ("Downloads", "downloads"), ("Follows", "follows")):
+            self.sort_combo.addItem(label, sort)
+
+        self.results_list = QListWidget(self)
+        self.results_list.itemDoubleClicked.connect(self.open_result)
+        self.status_label = QLabel(self)
+
+        self.search_layout = QHBoxLayout()
+        self.search_layout.addWidget(self.search_input)
+        self.search_layout.addWidget(self.category_combo)
+        self.search_layout.addWidget(self.sort_combo)
+        self.search_layout.addWidget(self.search_button)
+
+        self.layout.addLayout(self.search_layout)
+        self.layout.addWidget(self.results_list)
+        self.layout.addWidget(self.status_label)
         self.setLayout(self.layout)
 
-        self.search_button.clicked.connect(self.search)
+        # Each keystroke drops the search in flight and restarts the timer, so a new one only starts once typing
+        # pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(plugin_manager.search_config['debounce_ms'])
+        self.search_timer.timeout.connect(self.start_search)
+
+        self.search_input.textChanged.connect(self.query_changed)
+        self.search_button.clicked.connect(self.start_search)
+        self.search_input.returnPressed.connect(self.start_search)
+        self.category_combo.currentIndexChanged.connect(self.start_search)
+        self.sort_combo.currentIndexChanged.connect(self.start_search)
+        self.load_categories()
+
+    @asyncSlot()
+    async def load_categories(self):
+        for category in await self.plugin_manager.store.categories():
+            self.category_combo.addItem(category, category)
+
+    def query_changed(self):
+        self.cancel_search()
+        self.search_timer.start()
+
+    def start_search(self):
+        self.search_timer.stop()
+        query = self.search_input.text().strip()
+        key = (query, self.category_combo.currentData(), self.sort_combo.currentData())
+        # Enter right after the debounce fired asks for the search that is already running
+        if key == self.search_key and self.search_task is not None and not self.search_task.done():
+            return
+        self.cancel_search()
+        self.search_key = key
+        if not query:
+            self.results_list.clear()
+            self.status_label.clear()
+            return
+        self.search_task = asyncio.ensure_future(self.search(*key), loop=asyncio.get_event_loop())
+
+    def cancel_search(self):
+        # Cancelling the task closes the search generator, which cancels the outstanding source requests
+        if self.search_task is not None and not self.search_task.done():
+            self.search_task.cancel()
+        self.search_task = None
+
+    async def search(self, query, category, sort):
+        self.status_label.setText(f"Searching for {query}...")
+        try:
+            async with aclosing(self.plugin_manager.iter_search(query, category, sort)) as events:
+                async for event in events:
+                    self.show_results(event)
+        except Exception as e:
+            logger.error(f"Error searching plugins: {e}")
+            self.status_label.setText(f"Search failed: {e}")
+
+    def show_results(self, event):
+        results = event['results']
+        self.results_list.setUpdatesEnabled(False)
+        self.results_list.clear()
+        for plugin_data in results:
+            item = QListWidgetItem(f"{plugin_data['title']} by {plugin_data['author']} ({plugin_data['source']}, "
+                                   f"{plugin_data['downloads'] or 0} downloads)")
+            item.setToolTip(plugin_data['description'] or "")
+            item.setData(Qt.UserRole, plugin_data['url'])
+            self.results_list.addItem(item)
+        self.results_list.setUpdatesEnabled(True)
+
+        if event['origin'] == "local":
+            self.status_label.setText(f"{len(results)} results from the local store")
+        elif event['pending']:
+            self.status_label.setText(f"{len(results)} results from {SOURCE_LABELS[event['source']]}, "
+                                      f"waiting for more sources...")
+        else:
+            self.status_label.setText(f"{len(results)} results from Hangar and Modrinth")
+
+    def done(self, result):
+        self.search_timer.stop()
+        self.cancel_search()
+        super().done(result)
 
-    def search(self):
-        plugin_name = self.search_input.text()
-        # Implement the search functionality here
+    def open_result(self, item):
+        if item.data(Qt.UserRole):
+            QDesktopServices.openUrl(QUrl(item.data(Qt.UserRole)))
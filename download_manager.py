@@ -0,0 +1,218 @@
+import os
+import time
+import asyncio
+import shutil
+import hashlib
+from loguru import logger
+from metrics import metrics
+
+DEFAULT_DOWNLOADS_CONFIG = {
+    "concurrency": 8,
+    "retries": 3,
+    "write_buffer": 1024 * 1024
+}
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _hash_existing(path, algorithm):
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest
+
+
+def _read_validator(path):
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_validator(path, headers):
+    # A strong ETag, else Last-Modified; weak ETags are not allowed in If-Range
+    etag = headers.get('ETag')
+    validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+    if validator:
+        with open(path, 'w') as f:
+            f.write(validator)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _remove_staged(path):
+    for staged in (path, f"{path}.validator"):
+        if os.path.exists(staged):
+            os.remove(staged)
+
+
+def copy_file(source, destination):
+    # Staged like a download, so the destination is either the old file or the complete copy
+    staging_path = f"{destination}.part"
+    shutil.copyfile(source, staging_path)
+    os.replace(staging_path, destination)
+
+
+class DownloadManager:
+    # Downloads into "<destination>.part", resuming with Range requests after interruptions, verifies the
+    # expected hash and only then renames the file into place, so a failure never leaves a truncated jar behind
+    def __init__(self, downloads_config=None):
+        self.downloads_config = {**DEFAULT_DOWNLOADS_CONFIG, **(downloads_config or {})}
+        self._semaphore = asyncio.Semaphore(self.downloads_config['concurrency'])
+        self.bytes_downloaded = 0
+        self.active_time = 0.0
+        self._active = 0
+        self._active_since = None
+
+    @property
+    def throughput(self):
+        # Aggregate bytes per second over the time at least one download was running
+        elapsed = self.active_time + (time.monotonic() - self._active_since if self._active_since else 0)
+        return self.bytes_downloaded / elapsed if elapsed > 0 else 0.0
+
+    def _start(self):
+        if self._active == 0:
+            self._active_since = time.monotonic()
+        self._active += 1
+
+    def _stop(self):
+        self._active -= 1
+        if self._active == 0 and self._active_since is not None:
+            self.active_time += time.monotonic() - self._active_since
+            self._active_since = None
+
+    async def download(self, session, url, destination, expected_hash=None, progress=None):
+        # expected_hash is an (algorithm, hexdigest) pair; progress is called with a dict after each write
+        async with self._semaphore:
+            self._start()
+            try:
+                for attempt in range(self.downloads_config['retries'] + 1):
+                    try:
+                        await self._download_once(session, url, destination, expected_hash, progress)
+                        return True
+                    except DownloadError:
+                        raise
+                    except Exception as e:
+                        if attempt == self.downloads_config['retries']:
+                            raise DownloadError(f"Download of {url} failed: {e}") from e
+                        logger.warning(f"Download of {url} interrupted ({e}), resuming")
+                        metrics.increment("download_retries_total")
+                        await asyncio.sleep(min(2 ** attempt, 10))
+            finally:
+                self._stop()
+
+    async def _download_once(self, session, url, destination, expected_hash, progress):
+        # The staged file belongs to one URL and expected hash, so a different release with the same file name never
+        # resumes from it; the validator it was started with is kept beside it for If-Range
+        staging_key = hashlib.sha256(f"{url}\n{expected_hash[1] if expected_hash else ''}".encode('utf-8'))
+        staging_path = f"{destination}.{staging_key.hexdigest()[:16]}.part"
+        validator_path = f"{staging_path}.validator"
+        algorithm = expected_hash[0] if expected_hash and expected_hash[1] else None
+
+        offset = os.path.getsize(staging_path) if os.path.exists(staging_path) else 0
+        validator = await asyncio.to_thread(_read_validator, validator_path) if offset else None
+        if offset and validator is None and algorithm is None:
+            # Nothing could tell a changed file apart from the rest of the old one
+            logger.info(f"Discarding unverifiable partial download of {os.path.basename(destination)}")
+            offset = 0
+        digest = None
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if validator:
+                headers["If-Range"] = validator
+
+        async with session.stream("GET", url, headers=headers) as response:
+            if response.status_code == 416:
+                # The staged file is no good for this URL any more; start over next attempt
+                await asyncio.to_thread(_remove_staged, staging_path)
+                raise IOError("Requested range not satisfiable")
+            response.raise_for_status()
+            if response.status_code != 206:
+                await asyncio.to_thread(_write_validator, validator_path, response.headers)
+            if response.status_code == 206:
+                logger.info(f"Resuming {os.path.basename(destination)} at {offset} bytes")
+                if algorithm:
+                    digest = await asyncio.to_thread(_hash_existing, staging_path, algorithm)
+                mode = 'ab'
+            else:
+                offset = 0
+                mode = 'wb'
+            if algorithm and digest is None:
+                digest = hashlib.new(algorithm)
+
+            length = response.headers.get('Content-Length')
+            total = offset + int(length) if length else None
+            downloaded = offset
+            buffer = bytearray()
+            f = await asyncio.to_thread(open, staging_path, mode)
+            try:
+                async for chunk in response.aiter_bytes():
+                    buffer += chunk
+                    if digest is not None:
+                        digest.update(chunk)
+                    if len(buffer) >= self.downloads_config['write_buffer']:
+                        await asyncio.to_thread(f.write, bytes(buffer))
+                        downloaded += len(buffer)
+                        self.bytes_downloaded += len(buffer)
+                        metrics.increment("download_bytes_total", len(buffer))
+                        buffer.clear()
+                        if progress:
+                            progress({"url": url, "destination": destination, "downloaded": downloaded,
+                                      "total": total, "done": False})
+            finally:
+                # Whatever arrived is kept on disk, also after an interruption, so the next attempt resumes from it
+                if buffer:
+                    await asyncio.to_thread(f.write, bytes(buffer))
+                    downloaded += len(buffer)
+                    self.bytes_downloaded += len(buffer)
+                    metrics.increment("download_bytes_total", len(buffer))
+                await asyncio.to_thread(f.close)
+
+        if digest is not None and digest.hexdigest().lower() != expected_hash[1].lower():
+            await asyncio.to_thread(_remove_staged, staging_path)
+            raise DownloadError(f"Hash mismatch for {os.path.basename(destination)}")
+
+        await asyncio.to_thread(os.replace, staging_path, destination)
+        await asyncio.to_thread(_remove_staged, staging_path)
+        if progress:
+            progress({"url": url, "destination": destination, "downloaded": downloaded,
+                      "total": total or downloaded, "done": True})
+
+    async def _download_job(self, session, job, progress):
+        try:
+            with metrics.span("download"):
+                await self.download(session, job['url'], job['destination'], job.get('hash'), progress)
+            return job, None
+        except Exception as e:
+            logger.error(f"Error downloading {job['url']}: {e}")
+            return job, e
+
+    async def download_many(self, session, jobs, progress=None):
+        # jobs are dicts with "url", "destination" and optionally "hash"; returns (job, error or None) pairs
+        started = time.monotonic()
+        results = await asyncio.gather(*[self._download_job(session, job, progress) for job in jobs])
+        logger.info(f"Downloaded {sum(error is None for _, error in results)}/{len(jobs)} files in "
+                    f"{time.monotonic() - started:.1f}s ({self.throughput / 1024 / 1024:.1f} MiB/s)")
+        return results
+
+    async def iter_download_many(self, session, jobs, progress=None):
+        # Like download_many, but yields each (job, error or None) pair as its download finishes. Closing the
+        # generator cancels the downloads still running; their .part files are kept for resuming
+        started = time.monotonic()
+        tasks = [asyncio.ensure_future(self._download_job(session, job, progress)) for job in jobs]
+        succeeded = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                job, error = await next_result
+                succeeded += error is None
+                yield job, error
+        finally:
+            for task in tasks:
+                task.cancel()
+        logger.info(f"Downloaded {succeeded}/{len(jobs)} files in {time.monotonic() - started:.1f}s "
+                    f"({self.throughput / 1024 / 1024:.1f} MiB/s)")
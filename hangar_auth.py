@@ -0,0 +1,131 @@
+import asyncio
+import base64
+import json
+import time
+from loguru import logger
+from metrics import metrics
+
+DEFAULT_HANGAR_AUTH_CONFIG = {
+    "refresh_margin": 60,
+    "default_ttl": 300,
+    "redis_cache": True
+}
+
+
+def _jwt_expiry(token):
+    # Read the "exp" claim without verifying the signature; we only need to know when to refresh
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get('exp')
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+class HangarTokenManager:
+    REDIS_KEY = 'hangar:token'
+
+    def __init__(self, config, redis_client=None):
+        self.config = config
+        self.auth_config = {**DEFAULT_HANGAR_AUTH_CONFIG, **config.get('hangar_auth', {})}
+        self.redis_client = redis_client if self.auth_config['redis_cache'] else None
+        self._token = None
+        self._refresh_at = 0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self):
+        return self._token is not None and time.time() < self._refresh_at
+
+    async def get_token(self, session):
+        if self._is_fresh():
+            return self._token
+
+        # Only one coroutine refreshes; the rest wait and pick up its token
+        async with self._lock:
+            if self._is_fresh():
+                return self._token
+            if await self._load_from_redis():
+                return self._token
+            with metrics.span("hangar_auth"):
+                return await self._authenticate(session)
+
+    async def invalidate(self, token):
+        # Ignore stale tokens so that concurrent 401s trigger a single refresh
+        if token is not None and token == self._token:
+            logger.info("Hangar token rejected, will re-authenticate")
+            self._token = None
+            self._refresh_at = 0
+            if self.redis_client:
+                await self.redis_client.delete(self.REDIS_KEY)
+
+    async def _load_from_redis(self):
+        if not self.redis_client:
+            return False
+        cached = await self.redis_client.get(self.REDIS_KEY)
+        if not cached:
+            return False
+        try:
+            data = json.loads(cached)
+            self._token = data['token']
+            self._refresh_at = data['refresh_at']
+        except Exception as e:
+            logger.error(f"Error reading cached Hangar token: {e}")
+            return False
+        if not self._is_fresh():
+            self._token = None
+            return False
+        logger.info("Using cached Hangar token")
+        return True
+
+    async def _store_in_redis(self):
+        if not self.redis_client:
+            return
+        ttl = int(self._refresh_at - time.time())
+        if ttl > 0:
+            await self.redis_client.set(self.REDIS_KEY, json.dumps({
+                "token": self._token,
+                "refresh_at": self._refresh_at
+            }), ex=ttl)
+
+    async def _authenticate(self, session):
+        import httpx
+        try:
+            headers = {
+                "User-Agent": self.config['user_agent']
+            }
+            api_key = self.config['api_keys']['hangar']
+            response = await session.post(
+                f"{self.config['urls']['auth_hangar']}?apiKey={api_key}",
+                headers=headers
+            )
+            response.raise_for_status()
+
+            data = response.json()
+            token = data.get("token")
+            if not token:
+                logger.error("Token not found in Hangar API response")
+                return None
+
+            expires_at = _jwt_expiry(token)
+            if expires_at is None and data.get("expiresIn"):
+                # Hangar gives the lifetime in milliseconds
+                expires_at = time.time() + float(data["expiresIn"]) / 1000
+            if expires_at is None:
+                expires_at = time.time() + self.auth_config['default_ttl']
+
+            # Refresh a little before expiry, but never spend more than half the lifetime waiting
+            lifetime = max(expires_at - time.time(), 0)
+            self._token = token
+            self._refresh_at = expires_at - min(self.auth_config['refresh_margin'], lifetime / 2)
+            await self._store_in_redis()
+            logger.info(f"Authenticated with Hangar, token valid for {int(expires_at - time.time())}s")
+            return token
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Error authenticating with Hangar API: {e.response.status_code} - {e.response.text}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error during Hangar authentication: {e}")
+            return None
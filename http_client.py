@@ -1,32 +1,134 @@
-import httpx
-from contextlib import asynccontextmanager
+import time
+import hashlib
 from loguru import logger
+from scheduler import PRIORITY_BACKGROUND
+from metrics import metrics
 
-@asynccontextmanager
-async def http_session():
-    async with httpx.AsyncClient() as session:
-        try:
-            yield session
-        finally:
-            await session.aclose()
+DEFAULT_HTTP_CONFIG = {
+    "http2": True,
+    "max_connections": 50,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30,
+    "timeouts": {
+        "connect": 5,
+        "read": 15,
+        "write": 15,
+        "pool": 10
+    }
+}
 
-async def fetch(url, session, headers=None, params=None):
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_http_client(http_config=None, user_agent=None):
+    # httpx is imported where it is used, which keeps it off the startup path until the first request
+    import httpx
+    http_config = {**DEFAULT_HTTP_CONFIG, **(http_config or {})}
+    timeouts = {**DEFAULT_HTTP_CONFIG['timeouts'], **http_config.get('timeouts', {})}
+
+    http2 = http_config['http2']
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=http_config['max_connections'],
+        max_keepalive_connections=http_config['max_keepalive_connections'],
+        keepalive_expiry=http_config['keepalive_expiry']
+    )
+    timeout = httpx.Timeout(
+        connect=timeouts['connect'],
+        read=timeouts['read'],
+        write=timeouts['write'],
+        pool=timeouts['pool']
+    )
+    headers = {"User-Agent": user_agent} if user_agent else None
+
+    logger.info(f"HTTP client created (http2={http2}, max_connections={http_config['max_connections']})")
+    return httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout, headers=headers)
+
+
+def _auth_scope(headers):
+    # Responses are only shared between requests made with the same credentials
+    authorization = (headers or {}).get("Authorization")
+    return hashlib.sha256(authorization.encode('utf-8')).hexdigest()[:16] if authorization else ""
+
+
+async def _send(session, method, url, headers, params, json, scheduler, source, priority):
+    def send():
+        return session.request(method, url, headers=headers, params=params, json=json)
+
+    # Timed from the caller's side, so waiting for a scheduler slot counts towards the request
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = await (scheduler.run(source, send, priority) if scheduler is not None else send())
+        status = response.status_code
+        return response
+    finally:
+        metrics.observe("http_request_seconds", time.perf_counter() - started, source=source or "other",
+                        status=status)
+
+
+async def _revalidate(cache, key, entry, session, url, headers, params, scheduler, source, priority, ttl):
     try:
-        response = await session.get(url, headers=headers, params=params)
+        response = await _send(session, "GET", url, {**(headers or {}), **cache.conditional_headers(entry)},
+                               params, None, scheduler, source, priority)
+        if response.status_code == 304:
+            cache.touch(key, response, ttl)
+        elif response.status_code == 200:
+            await cache.store(key, response, ttl)
+    except Exception as e:
+        logger.warning(f"Background revalidation of {url} failed: {e}")
+
+
+async def fetch(url, session, headers=None, params=None, scheduler=None, source=None,
+                priority=PRIORITY_BACKGROUND, method="GET", json=None, cache=None, cache_scope=None,
+                cache_ttl=None, revalidate=False):
+    # With a ResponseCache, GETs are served locally while fresh, served stale and refreshed in the background
+    # within the stale-while-revalidate window, and revalidated with ETag/Last-Modified after that.
+    # revalidate=True always asks the origin, which costs a 304 when nothing changed
+    import httpx
+    try:
+        key = entry = cached_body = None
+        if cache is not None and cache.enabled and method == "GET":
+            key = cache.make_key(method, url, params, cache_scope if cache_scope is not None else _auth_scope(headers))
+            entry, cached_body = await cache.lookup(key)
+            if entry is None:
+                cache.stats["misses"] += 1
+                metrics.increment("http_cache_total", source=source or "other", result="miss")
+            else:
+                freshness = "expired" if revalidate else cache.freshness(entry)
+                if freshness == "fresh":
+                    cache.stats["fresh_hits"] += 1
+                    metrics.increment("http_cache_total", source=source or "other", result="fresh")
+                    return cached_body
+                if freshness == "stale":
+                    # Serve the stale copy now and refresh it for next time
+                    cache.stats["stale_hits"] += 1
+                    metrics.increment("http_cache_total", source=source or "other", result="stale")
+                    cache.revalidate_in_background(key, lambda: _revalidate(
+                        cache, key, entry, session, url, headers, params, scheduler, source, priority, cache_ttl))
+                    return cached_body
+                headers = {**(headers or {}), **cache.conditional_headers(entry)}
+
+        response = await _send(session, method, url, headers, params, json, scheduler, source, priority)
+        if response.status_code == 304 and entry is not None:
+            cache.touch(key, response, cache_ttl)
+            metrics.increment("http_cache_total", source=source or "other", result="not_modified")
+            return cached_body
         response.raise_for_status()
+        if key is not None:
+            await cache.store(key, response, cache_ttl)
         return response.json()
     except httpx.HTTPStatusError as e:
         return {"error": str(e), "status_code": e.response.status_code}
     except Exception as e:
         return {"error": str(e)}
 
-async def download_image(url, filepath):
-    try:
-        async with http_session() as session:
-            async with session.stream("GET", url) as response:
-                response.raise_for_status()
-                with open(filepath, 'wb') as f:
-                    async for chunk in response.aiter_bytes():
-                        f.write(chunk)
-    except Exception as e:
-        logger.error(f"Error downloading image: {e}")
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from urllib.parse import urlparse
+from loguru import logger
+from metrics import metrics
+from singleflight import SingleFlight
+
+DEFAULT_ICONS_CONFIG = {
+    "concurrency": 8,
+    "sizes": [64, 128],
+    "pixmap_cache_kb": 65536
+}
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg"
+}
+
+
+def thumbnail_path(image_filepath, size):
+    # Thumbnails sit next to the original as <sha>_<size>.png
+    return f"{os.path.splitext(image_filepath)[0]}_{size}.png"
+
+
+def make_thumbnails(image_filepath, sizes):
+    # Runs off the GUI thread; QImage (unlike QPixmap) is safe to use from worker threads. Qt is imported here
+    # so headless use never loads it, and without it the originals are simply kept as they are
+    try:
+        from PySide6.QtCore import Qt
+        from PySide6.QtGui import QImage
+    except ImportError:
+        return []
+    image = QImage(image_filepath)
+    if image.isNull():
+        return []
+    created = []
+    for size in sizes:
+        scaled = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if scaled.save(thumbnail_path(image_filepath, size), "PNG"):
+            created.append(size)
+    return created
+
+
+class IconCache:
+    # Icons stored once per content hash under cache/icons, with an index from icon URL to stored file so
+    # known URLs are never downloaded again, however many plugins share them
+    def __init__(self, cache_dir, icons_config=None, singleflight=None):
+        self.cache_dir = cache_dir
+        self.icons_config = {**DEFAULT_ICONS_CONFIG, **(icons_config or {})}
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._index = None
+        self._save_handle = None
+        self._semaphore = asyncio.Semaphore(self.icons_config['concurrency'])
+        # Overlapping fetch_many calls (a scan and a refresh, say) download a shared URL once
+        self.singleflight = singleflight if singleflight is not None else SingleFlight()
+
+    def _load_index(self):
+        index = {}
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r') as f:
+                    index = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading icon index: {e}")
+        return index
+
+    def _save_index(self, index):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(index, f)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"Error saving icon index: {e}")
+
+    def _schedule_save(self):
+        # Streaming scans resolve icons one plugin at a time, so index writes are coalesced
+        if self._save_handle is None:
+            self._save_handle = asyncio.get_running_loop().call_later(2, self._save_soon)
+
+    def _save_soon(self):
+        self._save_handle = None
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        if self._index is not None:
+            await asyncio.to_thread(self._save_index, dict(self._index))
+
+    def _has_thumbnails(self, image_filepath):
+        return all(os.path.exists(thumbnail_path(image_filepath, size)) for size in self.icons_config['sizes'])
+
+    def _store(self, content, extension):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        image_filepath = os.path.join(self.cache_dir, f"{hashlib.sha256(content).hexdigest()}{extension}")
+        if not os.path.exists(image_filepath):
+            # Two URLs serving the same image may be stored at once, so each thread stages its own copy
+            temp_path = f"{image_filepath}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, image_filepath)
+        if not self._has_thumbnails(image_filepath):
+            make_thumbnails(image_filepath, self.icons_config['sizes'])
+        return image_filepath
+
+    async def _download(self, session, url):
+        async with self._semaphore:
+            started = time.perf_counter()
+            response = await session.get(url)
+            metrics.observe("icon_download_seconds", time.perf_counter() - started, status=response.status_code)
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            extension = CONTENT_TYPE_EXTENSIONS.get(content_type) or os.path.splitext(urlparse(url).path)[1]
+            return await asyncio.to_thread(self._store, response.content, extension.lower())
+
+    async def _download_once(self, session, url):
+        return await self.singleflight.do(("icon", url), lambda: self._download(session, url))
+
+    async def fetch_many(self, session, urls, download=True):
+        # Returns {url: image_filepath} for every icon that is cached or could be downloaded; without download, only
+        # the cached ones
+        if self._index is None:
+            self._index = await asyncio.to_thread(self._load_index)
+
+        paths = {}
+        missing = []
+        for url in dict.fromkeys(url for url in urls if url):
+            image_filepath = self._index.get(url)
+            if image_filepath and os.path.exists(image_filepath):
+                paths[url] = image_filepath
+            else:
+                missing.append(url)
+        metrics.increment("icons_total", len(paths), result="cached")
+
+        if missing and download:
+            results = await asyncio.gather(*[self._download_once(session, url) for url in missing],
+                                           return_exceptions=True)
+            for url, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error downloading icon {url}: {result}")
+                    metrics.increment("icons_total", result="failed")
+                    continue
+                metrics.increment("icons_total", result="downloaded")
+                paths[url] = self._index[url] = result
+            self._schedule_save()
+            logger.debug(f"Downloaded {len(missing)} icons, {len(set(paths.values()))} distinct images cached")
+        return paths
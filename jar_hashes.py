@@ -0,0 +1,101 @@
+import os
+import json
+import mmap
+import asyncio
+import hashlib
+from loguru import logger
+
+# sha1/sha512 for Modrinth lookups, sha256 to compare against Hangar file info
+HASH_ALGORITHMS = ("sha1", "sha256", "sha512")
+# hashlib releases the GIL for large updates, so slices this big hash in parallel across threads
+SLICE_SIZE = 8 * 1024 * 1024
+
+
+def hash_file(path):
+    digests = {algorithm: hashlib.new(algorithm) for algorithm in HASH_ALGORITHMS}
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, SLICE_SIZE):
+                        chunk = view[offset:offset + SLICE_SIZE]
+                        for digest in digests.values():
+                            digest.update(chunk)
+                        chunk.release()
+                finally:
+                    view.release()
+    return {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+
+
+class HashCache:
+    # Jar hashes persisted by path and invalidated by (size, mtime), so unchanged jars are never re-hashed
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self._hashes = None
+        self._dirty = False
+        self._lock = asyncio.Lock()
+
+    def _load(self):
+        if self._hashes is not None:
+            return
+        self._hashes = {}
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r') as f:
+                    self._hashes = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading jar hash cache: {e}")
+
+    def _save(self, hashes):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(hashes, f)
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"Error saving jar hash cache: {e}")
+
+    def get(self, record):
+        entry = self._hashes.get(record['path'])
+        if entry and entry['size'] == record['size'] and entry['mtime'] == record['mtime'] and \
+                all(algorithm in entry for algorithm in HASH_ALGORITHMS):
+            return entry
+        return None
+
+    async def hash_records(self, records, executor=None):
+        async with self._lock:
+            return await self._hash_records(records, executor)
+
+    async def _hash_records(self, records, executor):
+        # Adds a hex digest per HASH_ALGORITHMS entry to each record in place; executor only runs the hashing
+        loop = asyncio.get_running_loop()
+        if self._hashes is None:
+            await loop.run_in_executor(None, self._load)
+
+        stale = []
+        for record in records:
+            entry = self.get(record)
+            if entry:
+                record.update({algorithm: entry[algorithm] for algorithm in HASH_ALGORITHMS})
+            else:
+                stale.append(record)
+
+        if stale:
+            results = await asyncio.gather(*[loop.run_in_executor(executor, hash_file, record['path'])
+                                             for record in stale], return_exceptions=True)
+            for record, hashes in zip(stale, results):
+                if isinstance(hashes, Exception):
+                    logger.warning(f"Could not hash {record['file']}: {hashes}")
+                    continue
+                record.update(hashes)
+                self._hashes[record['path']] = {"size": record['size'], "mtime": record['mtime'], **hashes}
+                self._dirty = True
+            logger.info(f"Hashed {len(stale)} jars")
+
+        if self._dirty:
+            self._dirty = False
+            await loop.run_in_executor(None, self._save, dict(self._hashes))
+        return records
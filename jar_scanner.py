@@ -0,0 +1,159 @@
+import os
+import asyncio
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from loguru import logger
+
+try:
+    import yaml
+    # The base loader leaves every scalar a string, so "version: 1.10" stays "1.10" instead of the float 1.1
+    _YamlLoader = getattr(yaml, 'CBaseLoader', yaml.BaseLoader)
+except ImportError:
+    yaml = None
+
+# Paper plugins ship paper-plugin.yml, Bukkit/Spigot plugins plugin.yml; prefer the Paper one
+MANIFEST_NAMES = ("paper-plugin.yml", "plugin.yml")
+UNKNOWN_VERSION = "Unknown Version"
+
+DEFAULT_SCANNER_CONFIG = {
+    "executor": "thread",
+    "workers": None
+}
+
+
+def _parse_simple_yaml(text):
+    # Fallback for when PyYAML is missing: top-level scalars and "- item" / "[a, b]" lists only
+    data = {}
+    current_list = None
+    for line in text.splitlines():
+        stripped = line.split(' #', 1)[0].rstrip()
+        if not stripped or stripped.lstrip().startswith('#'):
+            continue
+        if line[0] in (' ', '\t', '-'):
+            item = stripped.strip()
+            if current_list is not None and item.startswith('- '):
+                current_list.append(item[2:].strip().strip('\'"'))
+            continue
+        key, _, value = stripped.partition(':')
+        value = value.strip()
+        current_list = None
+        if not value:
+            current_list = data[key.strip()] = []
+        elif value.startswith('[') and value.endswith(']'):
+            data[key.strip()] = [item.strip().strip('\'"') for item in value[1:-1].split(',') if item.strip()]
+        else:
+            data[key.strip()] = value.strip('\'"')
+    return data
+
+
+def _parse_manifest(text):
+    if yaml is not None:
+        data = yaml.load(text, Loader=_YamlLoader)
+        return data if isinstance(data, dict) else {}
+    return _parse_simple_yaml(text)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    if isinstance(value, dict):
+        # paper-plugin.yml declares dependencies as nested maps
+        return [str(name) for name in value]
+    return [str(value)]
+
+
+def read_jar_manifest(path):
+    filename = os.path.basename(path)
+    stem = os.path.splitext(filename)[0]
+    stat = os.stat(path)
+    record = {
+        "file": filename,
+        "path": path,
+        "stem": stem,
+        "name": stem,
+        "version": UNKNOWN_VERSION,
+        "main": "",
+        "authors": [],
+        "depend": [],
+        "manifest": None,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime
+    }
+    try:
+        # ZipFile only reads the central directory; read() then seeks straight to the one entry
+        with zipfile.ZipFile(path) as jar:
+            entries = set(jar.namelist())
+            manifest_name = next((name for name in MANIFEST_NAMES if name in entries), None)
+            if manifest_name is None:
+                return record
+            data = _parse_manifest(jar.read(manifest_name).decode('utf-8', errors='replace'))
+    except Exception as e:
+        logger.warning(f"Could not read manifest from {filename}: {e}")
+        return record
+
+    dependencies = data.get('depend')
+    if dependencies is None and isinstance(data.get('dependencies'), dict):
+        dependencies = data['dependencies'].get('server', data['dependencies'])
+
+    record.update({
+        "name": str(data.get('name') or stem),
+        "version": str(data.get('version') or UNKNOWN_VERSION),
+        "main": str(data.get('main') or ""),
+        "authors": _as_list(data.get('authors')) + _as_list(data.get('author')),
+        "depend": _as_list(dependencies),
+        "manifest": manifest_name
+    })
+    return record
+
+
+class JarScanner:
+    def __init__(self, scanner_config=None):
+        self.scanner_config = {**DEFAULT_SCANNER_CONFIG, **(scanner_config or {})}
+        self._executor = None
+        # Parsed records by path along with the (size, mtime) they were read at, so unchanged jars
+        # are not reopened on rescans
+        self._records = {}
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            workers = self.scanner_config['workers']
+            if self.scanner_config['executor'] == "process":
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jar-scanner")
+        return self._executor
+
+    def _list_jars(self, folder_path):
+        jars = []
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jar") and entry.is_file():
+                    stat = entry.stat()
+                    jars.append((entry.path, stat.st_size, stat.st_mtime))
+        return sorted(jars)
+
+    async def scan(self, folder_path):
+        loop = asyncio.get_running_loop()
+        jars = await loop.run_in_executor(None, self._list_jars, folder_path)
+
+        stale = [path for path, size, mtime in jars if self._records.get(path, (None, None))[0] != (size, mtime)]
+        if stale:
+            records = await asyncio.gather(*[loop.run_in_executor(self.executor, read_jar_manifest, path)
+                                             for path in stale], return_exceptions=True)
+            for path, record in zip(stale, records):
+                if isinstance(record, Exception):
+                    logger.warning(f"Could not scan {path}: {record}")
+                    self._records.pop(path, None)
+                else:
+                    self._records[path] = ((record['size'], record['mtime']), record)
+            logger.info(f"Read {len(stale)} jar manifests from {folder_path}")
+
+        return [self._records[path][1] for path, _, _ in jars if path in self._records]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
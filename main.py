@@ -1,7 +1,7 @@
 import sys
 import asyncio
 from qasync import QEventLoop, QApplication as QAsyncApplication
-import qt_material
+from PySide6.QtGui import QColor, QPalette
 
 from MainWindow import MainWindow
 from logging_config import configure_logging
@@ -9,36 +9,69 @@ from plugin_manager import PluginManager
 from state_manager import State
 from config import Config
 
+THEME = 'dark_lightgreen.xml'
+# The theme's own colours, so the window does not flash light before the stylesheet replaces them
+STARTUP_PALETTE = {
+    QPalette.Window: "#232629",
+    QPalette.WindowText: "#ffffff",
+    QPalette.Base: "#31363b",
+    QPalette.AlternateBase: "#4f5b62",
+    QPalette.Text: "#ffffff",
+    QPalette.Button: "#31363b",
+    QPalette.ButtonText: "#ffffff",
+    QPalette.Highlight: "#8bc34a",
+    QPalette.HighlightedText: "#000000"
+}
 
-# Main function to initialize and run the application
-def main():
-    # Configure logging
-    configure_logging()
-
-    # Initialize the configuration
-    config = Config()
 
-    # Setup the application
-    app = QAsyncApplication(sys.argv)
-    qt_material.apply_stylesheet(app, theme='dark_lightgreen.xml')
+def create_application(argv):
+    app = QAsyncApplication(argv)
+    app.setStyle("Fusion")
+    palette = QPalette()
+    for role, color in STARTUP_PALETTE.items():
+        palette.setColor(role, QColor(color))
+    app.setPalette(palette)
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
+    return app, loop
+
+
+def apply_theme(app):
+    # qt_material pulls in jinja2 and renders its stylesheet, so it waits until the window has painted
+    import qt_material
+    qt_material.apply_stylesheet(app, theme=THEME)
+
 
-    # Initialize the database
-    plugin_manager = PluginManager()
+def create_main_window(app):
+    # Initialize the configuration
+    Config()
+
+    # One state and one manager for the whole app; the state itself is loaded after the first paint
+    plugin_manager = PluginManager(State())
     plugin_manager.init_db()
 
-    # Load state
-    state = State()
-    state.load_state()
+    main_window = MainWindow(plugin_manager)
+    main_window.painted.connect(lambda: apply_theme(app))
+    return main_window
+
+
+# Main function to initialize and run the application
+def main():
+    # Configure logging
+    configure_logging()
+
+    # Setup the application
+    app, loop = create_application(sys.argv)
 
     # Initialize and show the main window
-    main_window = MainWindow()
+    main_window = create_main_window(app)
     main_window.show()
 
     # Run the event loop
     with loop:
         loop.run_forever()
+        # Stop the scan and close the shared HTTP client once the window is gone
+        loop.run_until_complete(main_window.shutdown())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+from difflib import SequenceMatcher
+from utils import normalize_name
+
+np = None
+_numpy_loaded = False
+
+DEFAULT_THRESHOLD = 0.8
+NGRAM_SIZE = 3
+# Candidates kept per query after the n-gram prefilter, before exact re-scoring
+SHORTLIST_SIZE = 32
+# Upper bound on queries x candidates cells scored in one vectorized pass
+BATCH_CELLS = 4_000_000
+
+
+def _load_numpy():
+    # numpy is optional and only used once an index outgrows a shortlist, so it is not imported at startup
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        _numpy_loaded = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def candidate_name(plugin):
+    return plugin['title'] if plugin.get('title') else plugin['name']
+
+
+def ngrams(normalized_name, size=NGRAM_SIZE):
+    padded = f" {normalized_name} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+class MatchIndex:
+    # Precomputes normalized names and n-gram postings for a set of candidate plugins so that many
+    # queries can be ranked against it without re-normalizing anything
+    def __init__(self, candidates, ngram_size=NGRAM_SIZE):
+        self.candidates = list(candidates)
+        self.ngram_size = ngram_size
+        self.names = [normalize_name(candidate_name(candidate)) for candidate in self.candidates]
+        self._postings = None
+
+    def _build_postings(self):
+        # Only needed once there are more candidates than a shortlist, i.e. not for a page of search hits
+        _load_numpy()
+        self._ngram_ids = {}
+        postings = []
+        sizes = []
+        for index, name in enumerate(self.names):
+            grams = ngrams(name, self.ngram_size)
+            sizes.append(len(grams))
+            for gram in grams:
+                gram_id = self._ngram_ids.setdefault(gram, len(postings))
+                if gram_id == len(postings):
+                    postings.append([])
+                postings[gram_id].append(index)
+
+        if np is not None:
+            self._postings = [np.asarray(indices, dtype=np.int32) for indices in postings]
+            self._sizes = np.asarray(sizes, dtype=np.float32)
+        else:
+            self._postings = postings
+            self._sizes = sizes
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def _query_grams(self, normalized_query):
+        grams = ngrams(normalized_query, self.ngram_size)
+        return len(grams), [self._ngram_ids[gram] for gram in grams if gram in self._ngram_ids]
+
+    def _shortlists(self, normalized_queries, shortlist):
+        # Dice coefficient over character n-grams for every (query, candidate) pair, keeping the best few
+        count = len(self.candidates)
+        if count <= shortlist:
+            return [range(count)] * len(normalized_queries)
+        if self._postings is None:
+            self._build_postings()
+
+        if np is None:
+            results = []
+            for query in normalized_queries:
+                size, gram_ids = self._query_grams(query)
+                overlap = {}
+                for gram_id in gram_ids:
+                    for index in self._postings[gram_id]:
+                        overlap[index] = overlap.get(index, 0) + 1
+                scored = sorted(overlap, key=lambda i: -2 * overlap[i] / (size + self._sizes[i]))
+                results.append(scored[:shortlist])
+            return results
+
+        results = []
+        chunk = max(1, BATCH_CELLS // count)
+        for start in range(0, len(normalized_queries), chunk):
+            queries = normalized_queries[start:start + chunk]
+            query_sizes = np.empty(len(queries), dtype=np.float32)
+            flat = []
+            for row, query in enumerate(queries):
+                query_sizes[row], gram_ids = self._query_grams(query)
+                if gram_ids:
+                    flat.append(np.concatenate([self._postings[gram_id] for gram_id in gram_ids]) + row * count)
+            if flat:
+                overlap = np.bincount(np.concatenate(flat), minlength=len(queries) * count)
+            else:
+                overlap = np.zeros(len(queries) * count, dtype=np.int64)
+            overlap = overlap.reshape(len(queries), count)
+            dice = 2 * overlap / (query_sizes[:, None] + self._sizes[None, :])
+            top = np.argpartition(-dice, shortlist - 1, axis=1)[:, :shortlist]
+            for row in range(len(queries)):
+                results.append([int(index) for index in top[row] if overlap[row, index] > 0])
+        return results
+
+    def rank_many(self, queries, limit=10, threshold=0.0, shortlist=SHORTLIST_SIZE):
+        # Returns, for each query, a list of (score, candidate) pairs sorted best first
+        normalized_queries = [normalize_name(query) for query in queries]
+        shortlists = self._shortlists(normalized_queries, max(shortlist, limit))
+        ranked = []
+        for query, indices in zip(normalized_queries, shortlists):
+            # SequenceMatcher caches its second sequence, so keep the query there and swap candidates in
+            matcher = SequenceMatcher(None)
+            matcher.set_seq2(query)
+            scores = []
+            for index in indices:
+                matcher.set_seq1(self.names[index])
+                score = matcher.ratio()
+                if score >= threshold:
+                    scores.append((score, index))
+            scores.sort(key=lambda item: (-item[0], item[1]))
+            ranked.append([(score, self.candidates[index]) for score, index in scores[:limit]])
+        return ranked
+
+    def rank(self, query, limit=10, threshold=0.0):
+        return self.rank_many([query], limit, threshold)[0]
+
+    def best(self, query, threshold=DEFAULT_THRESHOLD):
+        ranked = self.rank(query, limit=1)
+        if ranked and ranked[0][0] > threshold:
+            return ranked[0][1]
+        return None
+
+
+def get_best_match(plugin_name, results, threshold=DEFAULT_THRESHOLD):
+    return MatchIndex(results).best(plugin_name, threshold)
+
+
+def rank_results(query, results, sort="relevance"):
+    # Orders search results merged from several sources. Relevance is the matcher's score against the query with
+    # downloads breaking ties; the other orders match the plugin store's
+    if sort in ("downloads", "follows"):
+        return sorted(results, key=lambda plugin_data: plugin_data.get(sort) or 0, reverse=True)
+    if sort == "updated":
+        return sorted(results, key=lambda plugin_data: plugin_data.get('date_modified') or "", reverse=True)
+    if sort == "title":
+        return sorted(results, key=lambda plugin_data: (plugin_data.get('title') or "").casefold())
+    # Candidates are indexed most downloaded first, so equal scores keep that order; every result is ranked
+    results = sorted(results, key=lambda plugin_data: plugin_data.get('downloads') or 0, reverse=True)
+    return [plugin_data for _, plugin_data in MatchIndex(results).rank(query, limit=len(results))]
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import bisect
+from loguru import logger
+
+DEFAULT_METRICS_CONFIG = {
+    "enabled": False,
+    # Seconds; anything slower lands in the +Inf bucket
+    "buckets": [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+}
+PREFIX = "pluginmanager_"
+
+
+def _series(name, labels, quote=True):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' if quote else f"{key}={value}" for key, value in labels) + "}"
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    # Times a block into the stage_seconds histogram, labelled with how the block ended
+    __slots__ = ("metrics", "labels", "started")
+
+    def __init__(self, metrics, labels):
+        self.metrics = metrics
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            outcome = "ok"
+        elif exc_type.__name__ == "CancelledError":
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        self.metrics.observe("stage_seconds", time.perf_counter() - self.started, outcome=outcome, **self.labels)
+        return False
+
+
+class Metrics:
+    # In-process counters and histograms keyed by (name, sorted labels). Everything is updated from the event loop,
+    # so there is no locking; when disabled every call returns straight away and span() hands out one shared no-op
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.metrics_config = dict(DEFAULT_METRICS_CONFIG)
+            self.enabled = False
+            self.export_dir = None
+            self.buckets = self.metrics_config['buckets']
+            self.counters = {}
+            self.histograms = {}
+            self.initialized = True
+
+    def configure(self, metrics_config=None, export_dir=None):
+        self.metrics_config = {**DEFAULT_METRICS_CONFIG, **(metrics_config or {})}
+        self.enabled = self.metrics_config['enabled']
+        self.buckets = sorted(self.metrics_config['buckets'])
+        self.export_dir = export_dir
+
+    def span(self, stage, **labels):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, {"stage": stage, **labels})
+
+    def increment(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            # Per-bucket counts (the last one is +Inf), then count and sum
+            histogram = self.histograms[key] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+        histogram[bisect.bisect_left(self.buckets, value)] += 1
+        histogram[-2] += 1
+        histogram[-1] += value
+
+    def checkpoint(self):
+        # Copy of the current values, so a summary can cover just what happened since
+        if not self.enabled:
+            return None
+        return {"counters": dict(self.counters),
+                "histograms": {key: list(histogram) for key, histogram in self.histograms.items()}}
+
+    def _since(self, checkpoint):
+        if checkpoint is None:
+            return self.counters, self.histograms
+        counters = {key: value - checkpoint['counters'].get(key, 0) for key, value in self.counters.items()}
+        histograms = {}
+        for key, histogram in self.histograms.items():
+            before = checkpoint['histograms'].get(key)
+            histograms[key] = histogram if before is None else [now - then for now, then in zip(histogram, before)]
+        return ({key: value for key, value in counters.items() if value},
+                {key: histogram for key, histogram in histograms.items() if histogram[-2]})
+
+    def _quantile(self, histogram, quantile):
+        # Linear interpolation inside the bucket holding the quantile, as Prometheus' histogram_quantile does
+        rank = quantile * histogram[-2]
+        seen = 0
+        for index, count in enumerate(histogram[:-2]):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return None
+
+    def summary(self, checkpoint=None):
+        counters, histograms = self._since(checkpoint)
+        summary = {"counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters.items()):
+            summary["counters"][_series(name, labels, quote=False)] = value
+        for (name, labels), histogram in sorted(histograms.items()):
+            count, total = histogram[-2], histogram[-1]
+            summary["histograms"][_series(name, labels, quote=False)] = {
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6),
+                "p50": round(self._quantile(histogram, 0.5), 6),
+                "p95": round(self._quantile(histogram, 0.95), 6)
+            }
+        return summary
+
+    def prometheus(self):
+        # Text exposition format, cumulative since the process started
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for (series_name, labels), value in sorted(self.counters.items()):
+                if series_name == name:
+                    lines.append(f"{_series(PREFIX + name, labels)} {value}")
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for (series_name, labels), histogram in sorted(self.histograms.items()):
+                if series_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip([*self.buckets, "+Inf"], histogram[:-2]):
+                    cumulative += count
+                    lines.append(f"{_series(PREFIX + name + '_bucket', (*labels, ('le', bound)))} {cumulative}")
+                lines.append(f"{_series(PREFIX + name + '_sum', labels)} {histogram[-1]}")
+                lines.append(f"{_series(PREFIX + name + '_count', labels)} {histogram[-2]}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, name, checkpoint=None):
+        # Writes <name>.prom (cumulative) and <name>.json (since the checkpoint) to the export directory and
+        # returns the summary
+        if not self.enabled:
+            return None
+        summary = self.summary(checkpoint)
+        if self.export_dir:
+            try:
+                os.makedirs(self.export_dir, exist_ok=True)
+                with open(os.path.join(self.export_dir, f"{name}.prom"), 'w') as f:
+                    f.write(self.prometheus())
+                with open(os.path.join(self.export_dir, f"{name}.json"), 'w') as f:
+                    json.dump(summary, f, indent=2)
+            except Exception as e:
+                logger.error(f"Error exporting metrics: {e}")
+        stages = [(series, histogram) for series, histogram in summary["histograms"].items()
+                  if series.startswith("stage_seconds")]
+        logger.info("Metrics: " + ", ".join(f"{series} {histogram['sum']:.3f}s/{histogram['count']}"
+                                             for series, histogram in stages))
+        return summary
+
+
+metrics = Metrics()
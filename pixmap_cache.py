@@ -0,0 +1,52 @@
+import os
+import asyncio
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPixmap, QPixmapCache
+from loguru import logger
+from icon_cache import thumbnail_path, DEFAULT_ICONS_CONFIG
+
+
+def configure(icons_config=None):
+    icons_config = {**DEFAULT_ICONS_CONFIG, **(icons_config or {})}
+    QPixmapCache.setCacheLimit(icons_config['pixmap_cache_kb'])
+
+
+def _key(image_filepath, size):
+    return f"{image_filepath}@{size}"
+
+
+def _read_image(image_filepath, size):
+    # Prefers the pre-scaled thumbnail; falls back to scaling the original for icons stored without one
+    path = thumbnail_path(image_filepath, size)
+    image = QImage(path if os.path.exists(path) else image_filepath)
+    if image.isNull():
+        return None
+    if image.width() > size or image.height() > size:
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+def get_pixmap(image_filepath, size):
+    # GUI thread only, and never touches the disk: icons get here through preload, a miss just returns None
+    if not image_filepath:
+        return None
+    pixmap = QPixmapCache.find(_key(image_filepath, size))
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+    return None
+
+
+async def preload(image_filepaths, sizes=(64, 128)):
+    # Decodes thumbnails on worker threads and only converts the small results to pixmaps on the GUI thread
+    pending = [(path, size) for path in dict.fromkeys(image_filepaths) if path for size in sizes
+               if QPixmapCache.find(_key(path, size)) is None]
+    if not pending:
+        return
+    try:
+        images = await asyncio.to_thread(lambda: [_read_image(path, size) for path, size in pending])
+    except Exception as e:
+        logger.error(f"Error preloading icons: {e}")
+        return
+    for (path, size), image in zip(pending, images):
+        if image is not None:
+            QPixmapCache.insert(_key(path, size), QPixmap.fromImage(image))
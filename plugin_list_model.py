@@ -0,0 +1,235 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QRect, QSize
+from PySide6.QtGui import QFont, QColor
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+from utils import prettify_date
+import pixmap_cache
+
+PluginRole = int(Qt.UserRole)
+FoundRole = PluginRole + 1
+SortNameRole = PluginRole + 2
+SortDateRole = PluginRole + 3
+SearchRole = PluginRole + 4
+UpdateRole = PluginRole + 5
+
+# data() runs for every visible cell and every sort comparison, so roles map straight to row fields by int
+ROLE_FIELDS = {
+    int(Qt.DisplayRole): "title",
+    int(Qt.ToolTipRole): "subtitle",
+    PluginRole: "plugin",
+    FoundRole: "found",
+    SortNameRole: "sort_name",
+    SortDateRole: "date_modified",
+    SearchRole: "search",
+    UpdateRole: "update"
+}
+
+ROW_HEIGHT = 72
+ICON_SIZE = 64
+
+
+def _found_row(plugin):
+    plugin_name, date_modified, title, url, plugin_data, image_filepath = plugin
+    return {
+        "key": plugin_name,
+        "found": True,
+        "plugin": plugin,
+        "title": title or plugin_name,
+        "sort_name": (title or plugin_name).lower(),
+        "subtitle": f"Date Modified: {prettify_date(date_modified or '')}",
+        "date_modified": date_modified or "",
+        "image_filepath": image_filepath,
+        "search": f"{plugin_name} {title} {plugin_data.get('author', '')}".lower(),
+        "update": None
+    }
+
+
+def _not_found_row(plugin):
+    plugin_name, plugin_version = plugin
+    return {
+        "key": plugin_name,
+        "found": False,
+        "plugin": None,
+        "title": plugin_name,
+        "sort_name": plugin_name.lower(),
+        "subtitle": f"Version: {plugin_version} - Not Found",
+        "date_modified": "",
+        "image_filepath": None,
+        "search": plugin_name.lower(),
+        "update": None
+    }
+
+
+class PluginListModel(QAbstractListModel):
+    # One lightweight dict per jar, keyed by file stem; rows are inserted, updated and removed in place so
+    # views keep their selection and scroll position across reloads
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._positions = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        field = ROLE_FIELDS.get(role)
+        if field is None or not index.isValid():
+            return None
+        return self._rows[index.row()][field]
+
+    def row_at(self, index):
+        return self._rows[index.row()] if index.isValid() else None
+
+    def key_at(self, index):
+        row = self.row_at(index)
+        return row['key'] if row else None
+
+    def keys(self):
+        return list(self._positions)
+
+    def _reindex(self, start=0):
+        for position in range(start, len(self._rows)):
+            self._positions[self._rows[position]['key']] = position
+
+    def _upsert_rows(self, rows):
+        new_rows = []
+        for row in rows:
+            position = self._positions.get(row['key'])
+            if position is None:
+                new_rows.append(row)
+                continue
+            row['update'] = self._rows[position]['update']
+            if row != self._rows[position]:
+                self._rows[position] = row
+                index = self.index(position)
+                self.dataChanged.emit(index, index)
+        if new_rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+            self._rows.extend(new_rows)
+            self._reindex(start)
+            self.endInsertRows()
+
+    def add_found(self, plugin):
+        self._upsert_rows([_found_row(plugin)])
+
+    def add_not_found(self, plugin):
+        self._upsert_rows([_not_found_row(plugin)])
+
+    def set_plugins(self, found_plugins, not_found_plugins):
+        # Applies the difference to the current rows instead of resetting the model
+        rows = [_found_row(plugin) for plugin in found_plugins] + \
+               [_not_found_row(plugin) for plugin in not_found_plugins]
+        keys = {row['key'] for row in rows}
+        self.remove_keys([key for key in self._positions if key not in keys])
+        self._upsert_rows(rows)
+
+    def remove_keys(self, keys):
+        positions = sorted((self._positions[key] for key in keys if key in self._positions), reverse=True)
+        # Remove contiguous runs from the bottom up so earlier positions stay valid
+        while positions:
+            last = first = positions.pop(0)
+            while positions and positions[0] == first - 1:
+                first = positions.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for row in self._rows[first:last + 1]:
+                del self._positions[row['key']]
+            del self._rows[first:last + 1]
+            self._reindex(first)
+            self.endRemoveRows()
+
+    def set_update(self, key, update):
+        position = self._positions.get(key)
+        if position is not None:
+            self._rows[position]['update'] = update
+            index = self.index(position)
+            self.dataChanged.emit(index, index, [UpdateRole])
+
+    def icons_loaded(self, image_filepaths):
+        # Repaints the rows showing any of these icons
+        image_filepaths = set(image_filepaths)
+        for position, row in enumerate(self._rows):
+            if row['image_filepath'] in image_filepaths:
+                index = self.index(position)
+                self.dataChanged.emit(index, index, [int(Qt.DecorationRole)])
+
+    def image_filepaths(self):
+        return [row['image_filepath'] for row in self._rows if row['image_filepath']]
+
+
+class PluginFilterProxy(QSortFilterProxyModel):
+    # Case-insensitive substring filter over name/title/author; sorting keeps resolved plugins first
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterRole(SearchRole)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setSortRole(SortNameRole)
+        self.setDynamicSortFilter(True)
+
+    def lessThan(self, left, right):
+        # Reads the source rows directly; going through data() per comparison dominates sorting large lists
+        model = self.sourceModel()
+        left_row, right_row = model.row_at(left), model.row_at(right)
+        if left_row['found'] != right_row['found']:
+            return left_row['found'] if self.sortOrder() == Qt.AscendingOrder else right_row['found']
+        field = ROLE_FIELDS[self.sortRole()]
+        return left_row[field] < right_row[field]
+
+
+class PluginDelegate(QStyledItemDelegate):
+    # Paints rows straight from the model; nothing is allocated per row beyond what is on screen
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._title_font = None
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        source = index.model().mapToSource(index) if isinstance(index.model(), QSortFilterProxyModel) else index
+        row = source.model().row_at(source)
+        if row is None:
+            return
+
+        painter.save()
+        style = option.widget.style() if option.widget else None
+        if style:
+            style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+
+        selected = bool(option.state & QStyle.State_Selected)
+        painter.setPen(option.palette.highlightedText().color() if selected else option.palette.text().color())
+
+        rect = option.rect
+        icon_rect = QRect(rect.left() + 4, rect.top() + (rect.height() - ICON_SIZE) // 2, ICON_SIZE, ICON_SIZE)
+        pixmap = pixmap_cache.get_pixmap(row['image_filepath'], ICON_SIZE)
+        if pixmap is not None:
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(icon_rect.center())
+            painter.drawPixmap(target, pixmap)
+        elif row['image_filepath']:
+            # Not decoded yet; the row is repainted once the window has preloaded it
+            painter.fillRect(icon_rect, option.palette.alternateBase())
+        else:
+            painter.drawText(icon_rect, Qt.AlignCenter, "No Image")
+
+        if self._title_font is None:
+            self._title_font = QFont(option.font)
+            self._title_font.setBold(True)
+        text_left = icon_rect.right() + 12
+        title_rect = QRect(text_left, rect.top() + 8, rect.right() - text_left - 4, rect.height() // 2 - 8)
+        subtitle_rect = QRect(text_left, rect.top() + rect.height() // 2, title_rect.width(), rect.height() // 2 - 8)
+
+        painter.setFont(self._title_font)
+        painter.drawText(title_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         painter.fontMetrics().elidedText(row['title'], Qt.ElideRight, title_rect.width()))
+        painter.setFont(option.font)
+        subtitle = row['subtitle']
+        update = row['update']
+        if update and update.get('update_available'):
+            painter.setPen(QColor("#8bc34a"))
+            subtitle = f"{subtitle}    Update: {update['current_version']} -> {update['latest_version']} " \
+                       f"({prettify_date(update['latest_date'] or '')})"
+        elif not row['found']:
+            painter.setPen(option.palette.placeholderText().color())
+        painter.drawText(subtitle_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         painter.fontMetrics().elidedText(subtitle, Qt.ElideRight, subtitle_rect.width()))
+        painter.restore()
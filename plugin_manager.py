@@ -1,22 +1,89 @@
 import os
+import json
 import asyncio
-import flatbuffers
-import httpx
-from contextlib import asynccontextmanager
+import hashlib
+import traceback
+from contextlib import aclosing
 from loguru import logger
-from difflib import SequenceMatcher
-from utils import prettify_date, normalize_name, get_best_match, scan_folder, fetch, download_image, http_session
-from redis_client import RedisClient
+from utils import normalize_name
+from jar_scanner import JarScanner
+from jar_hashes import HashCache
+from update_checker import UpdateChecker
+from response_cache import ResponseCache
+from download_manager import DownloadManager, copy_file
+from icon_cache import IconCache
+from matcher import get_best_match, rank_results, DEFAULT_THRESHOLD
+from http_client import create_http_client, fetch
+from hangar_auth import HangarTokenManager
+from cache import PluginCache, LRUTTLCache
+from singleflight import SingleFlight
+from scheduler import RequestScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from redis_client import AsyncRedisClient
 from state_manager import State
-from PluginManager import Plugin as FlatbufferPlugin
+from plugin_record import PluginRecord, PluginSerializer
+from catalog import CatalogSnapshot
+from plugin_store import PluginStore
+from metrics import metrics
 from config import Config
 
+DEFAULT_SEARCH_CONFIG = {
+    "debounce_ms": 250,
+    "recent_queries": 64,
+    "recent_ttl": 300
+}
+
+
 class PluginManager:
-    def __init__(self):
+    def __init__(self, state=None):
         self.config = Config().config
         logger.info(self.config.get('api_keys'))
-        self.redis_client = RedisClient()
-        self.state = State()
+        self.redis_client = AsyncRedisClient(**self.config.get('redis', {}))
+        self.state = state if state is not None else State()
+        self.plugin_serializer = PluginSerializer()
+        self.plugin_cache = PluginCache(self.redis_client, self.serialize_plugin, self.deserialize_plugin,
+                                        self.config.get('cache'))
+        self.hangar_auth = HangarTokenManager(self.config, self.redis_client)
+        self.scheduler = RequestScheduler(self.config.get('scheduler'))
+        self.match_threshold = self.config.get('matching', {}).get('threshold', DEFAULT_THRESHOLD)
+        self.jar_scanner = JarScanner(self.config.get('scanner'))
+        self.identification_config = {"mode": "hash", "algorithm": "sha1", "batch_size": 500,
+                                      **self.config.get('identification', {})}
+        self.hash_cache = HashCache(os.path.join(self.config.get('paths', {}).get('cache_dir', 'cache'),
+                                                 'jar_hashes.json'))
+        self.update_checker = UpdateChecker(self)
+        self.response_cache = ResponseCache(os.path.join(self.config.get('paths', {}).get('cache_dir', 'cache'), 'http'),
+                                            self.config.get('response_cache'))
+        self.store = PluginStore(self.config.get('paths', {}).get('db_path', 'cache/plugins.db'),
+                                 self.config.get('db_schema', {}))
+        self.catalog = CatalogSnapshot(self.config.get('paths', {}).get('catalog_path', 'cache/catalog.fb'))
+        self.downloads = DownloadManager(self.config.get('downloads'))
+        self.singleflight = SingleFlight()
+        self.icon_cache = IconCache(os.path.join(self.config.get('paths', {}).get('cache_dir', 'cache'), 'icons'),
+                                    self.config.get('icons'), self.singleflight)
+        self.search_config = {**DEFAULT_SEARCH_CONFIG, **self.config.get('search', {})}
+        self.recent_searches = LRUTTLCache(self.search_config['recent_queries'], self.search_config['recent_ttl'])
+        metrics.configure(self.config.get('metrics'),
+                          os.path.join(self.config.get('paths', {}).get('cache_dir', 'cache'), 'metrics'))
+        self._http = None
+
+    @property
+    def http(self):
+        # One pooled client for all Modrinth/Hangar traffic, created on first use
+        if self._http is None or self._http.is_closed:
+            self._http = create_http_client(self.config.get('http'), self.config.get('user_agent'))
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+            logger.info("HTTP client closed")
+        self._http = None
+        await self.response_cache.flush()
+        await self.icon_cache.flush()
+        await self.redis_client.aclose()
+        self.catalog.close()
+        await self.store.close()
+        self.jar_scanner.shutdown()
 
     def init_db(self):
         cache_dir = self.config.get('paths', {}).get('cache_dir', 'cache')
@@ -27,152 +94,308 @@ class PluginManager:
             logger.info(f"Cache directory already exists at {cache_dir}")
 
     async def insert_or_update_plugin(self, plugin_data):
+        await self.insert_or_update_plugins({plugin_data['name']: plugin_data})
+
+    async def insert_or_update_plugins(self, plugins_by_name):
+        # plugins_by_name maps lookup names to plugin data; Redis gets one pipeline, SQLite one transaction
         try:
-            key = f"plugin:{plugin_data['name']}"
-            serialized_data = self.serialize_plugin(plugin_data)
-            self.redis_client.set(key, serialized_data)
+            await self.plugin_cache.set_many(plugins_by_name)
         except Exception as e:
             logger.error(f"Error inserting or updating plugin data: {e}")
+        await self.store.upsert_many(plugins_by_name.values())
+
+    async def mark_plugins_not_found(self, plugin_names):
+        try:
+            await self.plugin_cache.set_not_found_many(plugin_names)
+        except Exception as e:
+            logger.error(f"Error caching missing plugins: {e}")
 
     async def get_plugin_from_db(self, plugin_name):
         try:
-            key = f"plugin:{plugin_name}"
-            plugin_data = self.redis_client.get(key)
-            if plugin_data:
-                return self.deserialize_plugin(plugin_data)
-            return None
+            plugin_data, _ = await self.plugin_cache.get(plugin_name)
+            return plugin_data
         except Exception as e:
             logger.error(f"Error fetching plugin from database: {e}")
             return None
 
+    async def get_plugins_from_db(self, plugin_names):
+        found, _ = await self.lookup_plugins(plugin_names)
+        return found
+
+    async def lookup_plugins(self, plugin_names):
+        # Returns (found, not_found) where not_found holds names cached as matching neither source. Names Redis
+        # does not know, or all of them when it is unreachable, fall back to the local catalog snapshot
+        plugin_names = list(plugin_names)
+        try:
+            found, not_found = await self.plugin_cache.get_many(plugin_names)
+        except Exception as e:
+            logger.error(f"Error fetching plugins from database: {e}")
+            found, not_found = {}, set()
+        unknown = [name for name in plugin_names if name not in found and name not in not_found]
+        if unknown:
+            found.update(self.catalog.get_many(unknown))
+        return found, not_found
+
+    def cache_stats(self):
+        return self.plugin_cache.stats()
+
     def serialize_plugin(self, plugin_data):
-        builder = flatbuffers.Builder(1024)
-
-        name = builder.CreateString(plugin_data['name'])
-        title = builder.CreateString(plugin_data['title'])
-        description = builder.CreateString(plugin_data['description'])
-        author = builder.CreateString(plugin_data['author'])
-        date_created = builder.CreateString(plugin_data['date_created'])
-        date_modified = builder.CreateString(plugin_data['date_modified'])
-        icon_url = builder.CreateString(plugin_data['icon_url'])
-        category = builder.CreateString(plugin_data['category'])
-        url = builder.CreateString(plugin_data['url'])
-        source = builder.CreateString(plugin_data['source'])
-
-        FlatbufferPlugin.PluginStart(builder)
-        FlatbufferPlugin.PluginAddName(builder, name)
-        FlatbufferPlugin.PluginAddTitle(builder, title)
-        FlatbufferPlugin.PluginAddDescription(builder, description)
-        FlatbufferPlugin.PluginAddAuthor(builder, author)
-        FlatbufferPlugin.PluginAddDateCreated(builder, date_created)
-        FlatbufferPlugin.PluginAddDateModified(builder, date_modified)
-        FlatbufferPlugin.PluginAddIconUrl(builder, icon_url)
-        FlatbufferPlugin.PluginAddCategory(builder, category)
-        FlatbufferPlugin.PluginAddDownloads(builder, plugin_data['downloads'])
-        FlatbufferPlugin.PluginAddFollows(builder, plugin_data['follows'])
-        FlatbufferPlugin.PluginAddUrl(builder, url)
-        FlatbufferPlugin.PluginAddSource(builder, source)
-        plugin = FlatbufferPlugin.PluginEnd(builder)
-        builder.Finish(plugin)
-
-        return bytes(builder.Output())
+        return self.plugin_serializer.serialize(plugin_data)
 
     def deserialize_plugin(self, data):
-        plugin = FlatbufferPlugin.Plugin.GetRootAsPlugin(data, 0)
-        return {
-            "name": plugin.Name().decode('utf-8'),
-            "title": plugin.Title().decode('utf-8'),
-            "description": plugin.Description().decode('utf-8'),
-            "author": plugin.Author().decode('utf-8'),
-            "date_created": plugin.DateCreated().decode('utf-8'),
-            "date_modified": plugin.DateModified().decode('utf-8'),
-            "icon_url": plugin.IconUrl().decode('utf-8'),
-            "category": plugin.Category().decode('utf-8'),
-            "downloads": plugin.Downloads(),
-            "follows": plugin.Follows(),
-            "url": plugin.Url().decode('utf-8'),
-            "source": plugin.Source().decode('utf-8')
-        }
+        # Lazy record over the cached bytes; fields are decoded only when read
+        return PluginRecord.from_bytes(data)
+
+    async def search_plugin(self, plugin_name, source="both", priority=PRIORITY_INTERACTIVE, use_cache=True):
+        with metrics.span("search_plugin", priority="interactive" if priority == PRIORITY_INTERACTIVE else
+                          "background"):
+            return await self._search_plugin(plugin_name, source, priority, use_cache)
 
-    async def search_plugin(self, plugin_name, source="both"):
-        async with http_session() as session:
-            normalized_plugin_name = normalize_name(plugin_name)
+    async def _search_plugin(self, plugin_name, source, priority, use_cache):
+        normalized_plugin_name = normalize_name(plugin_name)
 
-            # Check cache (Redis) first
-            cached_data = await self.get_plugin_from_db(normalized_plugin_name)
+        # Check cache (Redis) first; bulk callers resolve the cache themselves and write back in one batch
+        if use_cache:
+            cached_data, known_missing = await self.plugin_cache.get(normalized_plugin_name)
             if cached_data:
                 logger.info(f"Found cached data for {plugin_name}")
                 return [cached_data], "cache"
+            if known_missing and source == "both":
+                return [], None
 
-            # Search in Hangar
-            if source in ("hangar", "both"):
-                token = await self.authenticate_hangar()
-                if token:
-                    hangar_results = await fetch(self.config['urls']['search_hangar'], session, headers={
-                        "Authorization": f"Bearer {token}",
-                        "User-Agent": self.config['user_agent']
-                    }, params={"q": normalized_plugin_name, "limit": 10})
-                    if hangar_results:
-                        hangar_plugins = [self.convert_to_unified(plugin, "hangar") for plugin in
-                                          hangar_results.get('result', [])]
-                        best_match = get_best_match(normalized_plugin_name, hangar_plugins)
-                        if best_match:
-                            await self.insert_or_update_plugin(best_match)
-                            return [best_match], "hangar"
-
-            # If not found in Hangar or no best match, search in Modrinth
-            if source in ("modrinth", "both"):
-                modrinth_results = await fetch(self.config['urls']['search_modrinth'], session, headers={
-                    "Authorization": f"Bearer {self.config['api_keys']['modrinth']}",
-                    "User-Agent": self.config['user_agent']
-                }, params={
-                    "query": plugin_name,
-                    "limit": 10,
-                    "facets": "[[\"categories:utility\"]]",
-                    "sort": "popularity"
-                })
-                if modrinth_results:
-                    modrinth_plugins = [self.convert_to_unified(plugin, "modrinth") for plugin in
-                                        modrinth_results.get('hits', [])]
-                    best_match = get_best_match(normalized_plugin_name, modrinth_plugins)
-                    if best_match:
-                        await self.insert_or_update_plugin(best_match)
-                        return [best_match], "modrinth"
+        # A scan already searches each normalized name once, so this only joins overlapping scans in this process
+        # into one set of requests and one cache write. The search dialog does not come through here: iter_search
+        # uses its own hangar_search and modrinth_search keys, which coalesce only with searches for the same query
+        return await self.singleflight.do(("search", normalized_plugin_name, source), lambda: self._search_sources(
+            plugin_name, normalized_plugin_name, source, priority, use_cache))
 
+    async def _search_sources(self, plugin_name, normalized_plugin_name, source, priority, use_cache):
+        # Returns (None, None) when no match was found but a source could not be asked, so the name is retried
+        # later rather than cached as matching nowhere
+        failed = False
+
+        # Search in Hangar
+        if source in ("hangar", "both"):
+            hangar_results = await self.fetch_hangar(self.config['urls']['search_hangar'],
+                                                     params={"q": normalized_plugin_name, "limit": 10},
+                                                     priority=priority)
+            if not hangar_results or 'error' in hangar_results:
+                logger.warning(f"Hangar search for {plugin_name!r} failed: {(hangar_results or {}).get('error')}")
+                failed = True
+            else:
+                hangar_plugins = [self.convert_to_unified(plugin, "hangar") for plugin in
+                                  hangar_results.get('result', [])]
+                with metrics.span("match", source="hangar"):
+                    best_match = get_best_match(normalized_plugin_name, hangar_plugins, self.match_threshold)
+                if best_match:
+                    if use_cache:
+                        await self.insert_or_update_plugins({normalized_plugin_name: best_match})
+                    return [best_match], "hangar"
+
+        # If not found in Hangar or no best match, search in Modrinth
+        if source in ("modrinth", "both"):
+            modrinth_results = await fetch(self.config['urls']['search_modrinth'], self.http,
+                                           headers=self.modrinth_headers(), params={
+                "query": plugin_name,
+                "limit": 10,
+                "facets": "[[\"categories:utility\"]]",
+                "sort": "popularity"
+            }, scheduler=self.scheduler, source="modrinth", priority=priority, cache=self.response_cache)
+            if not modrinth_results or 'error' in modrinth_results:
+                logger.warning(f"Modrinth search for {plugin_name!r} failed: {(modrinth_results or {}).get('error')}")
+                failed = True
+            else:
+                modrinth_plugins = [self.convert_to_unified(plugin, "modrinth") for plugin in
+                                    modrinth_results.get('hits', [])]
+                with metrics.span("match", source="modrinth"):
+                    best_match = get_best_match(normalized_plugin_name, modrinth_plugins, self.match_threshold)
+                if best_match:
+                    if use_cache:
+                        await self.insert_or_update_plugins({normalized_plugin_name: best_match})
+                    return [best_match], "modrinth"
+
+        if failed:
+            return None, None
+        if use_cache and source == "both":
+            await self.mark_plugins_not_found([normalized_plugin_name])
         return [], None
 
-    async def authenticate_hangar(self):
+    async def search_plugins(self, query, category=None, sort="relevance", limit=50, remote=True):
+        event = {"results": [], "origin": "local"}
+        async with aclosing(self.iter_search(query, category, sort, limit, remote)) as events:
+            async for event in events:
+                pass
+        return event['results'], event['origin']
+
+    async def iter_search(self, query, category=None, sort="relevance", limit=50, remote=True):
+        # Yields {"results", "origin", "source", "pending"} snapshots as results arrive: the local full-text search
+        # first, and only when that finds nothing, Hangar and Modrinth concurrently with each source merged into the
+        # ranking as it responds. Closing the generator cancels whichever source is still outstanding
+        key = (query.strip().casefold(), category, sort, limit, remote)
+        recent = self.recent_searches.get(key)
+        if recent is not None:
+            yield recent
+            return
+
+        results = await self.store.search(query, category, sort, limit)
+        if results or not remote or not query.strip():
+            event = {"results": results, "origin": "local", "source": None, "pending": 0}
+            self.recent_searches.set(key, event)
+            yield event
+            return
+
+        searches = {asyncio.ensure_future(self.search_hangar(query, limit)): "hangar",
+                    asyncio.ensure_future(self.search_modrinth(query, limit)): "modrinth"}
+        merged = {}
+        complete = True
+        event = None
         try:
-            async with httpx.AsyncClient() as session:
-                headers = {
-                    "User-Agent": self.config['user_agent']
-                }
-                api_key = self.config['api_keys']['hangar']
-                response = await session.post(
-                    f"{self.config['urls']['auth_hangar']}?apiKey={api_key}",
-                    headers=headers
-                )
-                response.raise_for_status()
-
-                # Log the raw response for debugging
-                logger.info(f"Raw response: {response.text}")
-
-                # Parse the response as JSON and get the token
-                data = response.json()
-                token = data.get("token")
-                if token:
-                    logger.info(f"Authenticated with Hangar. Token: {token}")
-                    return token
-                else:
-                    logger.error("Token not found in Hangar API response")
-                    return None
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Error authenticating with Hangar API: {e.response.status_code} - {e.response.text}")
+            pending = set(searches)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    found = task.result()
+                    if found is None:
+                        complete = False
+                        found = []
+                    # Remember every hit so the same search is answered locally next time
+                    await self.store.upsert_many(found)
+                    for plugin_data in found:
+                        if not category or plugin_data['category'] == category:
+                            merged[(plugin_data['source'], plugin_data['name'])] = plugin_data
+                    event = {"results": rank_results(query, merged.values(), sort)[:limit], "origin": "remote",
+                             "source": searches[task], "pending": len(pending)}
+                    yield event
+        finally:
+            for task in searches:
+                task.cancel()
+        # A failed source would otherwise pin a partial answer until the entry expires
+        if complete:
+            self.recent_searches.set(key, event)
+
+    async def search_hangar(self, query, limit=25, priority=PRIORITY_INTERACTIVE):
+        return await self.singleflight.do(("hangar_search", query.strip().casefold(), min(limit, 25)),
+                                          lambda: self._search_hangar(query, limit, priority))
+
+    async def _search_hangar(self, query, limit, priority):
+        hangar_results = await self.fetch_hangar(self.config['urls']['search_hangar'],
+                                                 params={"q": query, "limit": min(limit, 25)}, priority=priority)
+        if not hangar_results or 'error' in hangar_results:
+            logger.warning(f"Hangar search for {query!r} failed: {(hangar_results or {}).get('error')}")
             return None
-        except Exception as e:
-            logger.error(f"Unexpected error during Hangar authentication: {e}")
+        return [self.convert_to_unified(plugin, "hangar") for plugin in hangar_results.get('result', [])]
+
+    async def search_modrinth(self, query, limit=100, priority=PRIORITY_INTERACTIVE):
+        return await self.singleflight.do(("modrinth_search", query.strip().casefold(), min(limit, 100)),
+                                          lambda: self._search_modrinth(query, limit, priority))
+
+    async def _search_modrinth(self, query, limit, priority):
+        modrinth_results = await fetch(self.config['urls']['search_modrinth'], self.http,
+                                       headers=self.modrinth_headers(), params={
+            "query": query,
+            "limit": min(limit, 100),
+            "facets": "[[\"categories:paper\",\"categories:spigot\",\"categories:bukkit\"]]"
+        }, scheduler=self.scheduler, source="modrinth", priority=priority, cache=self.response_cache)
+        if 'error' in modrinth_results:
+            logger.warning(f"Modrinth search for {query!r} failed: {modrinth_results['error']}")
             return None
+        return [self.convert_to_unified(plugin, "modrinth") for plugin in modrinth_results.get('hits', [])]
+
+    def modrinth_headers(self):
+        return {
+            "Authorization": f"Bearer {self.config['api_keys']['modrinth']}",
+            "User-Agent": self.config['user_agent']
+        }
+
+    async def identify_by_hash(self, records, priority=PRIORITY_BACKGROUND):
+        # Resolves jars through Modrinth's bulk version-file lookup; returns plugin data by jar path. Copies of the
+        # same jar hash alike and are looked up once
+        algorithm = self.identification_config['algorithm']
+        batch_size = self.identification_config['batch_size']
+        await self.hash_cache.hash_records(records, self.jar_scanner.executor)
+        records_by_hash = {record[algorithm]: record for record in records if record.get(algorithm)}
+
+        hashes = list(records_by_hash)
+        versions = {}
+        for start in range(0, len(hashes), batch_size):
+            result = await fetch(self.config['urls']['version_files_modrinth'], self.http,
+                                 headers=self.modrinth_headers(), method="POST",
+                                 json={"hashes": hashes[start:start + batch_size], "algorithm": algorithm},
+                                 scheduler=self.scheduler, source="modrinth", priority=priority)
+            if 'error' in result:
+                logger.error(f"Error looking up jar hashes on Modrinth: {result['error']}")
+                continue
+            versions.update(result)
+
+        projects = await self.fetch_modrinth_projects([version['project_id'] for version in versions.values()],
+                                                      priority)
+        identified = {}
+        for file_hash, version in versions.items():
+            project = projects.get(version['project_id'])
+            record = records_by_hash.get(file_hash)
+            if project and record:
+                identified[record['path']] = project
+        logger.info(f"Identified {len(identified)} of {len(records_by_hash)} distinct jars by hash")
+        return identified
+
+    async def fetch_modrinth_update(self, body, priority=PRIORITY_BACKGROUND):
+        return await fetch(self.config['urls']['update_modrinth'], self.http, headers=self.modrinth_headers(),
+                           method="POST", json=body, scheduler=self.scheduler, source="modrinth", priority=priority)
+
+    async def fetch_modrinth_projects(self, project_ids, priority=PRIORITY_BACKGROUND):
+        # Bulk project and team lookups, 100 ids per request; returns unified plugin data by project id. Ids are
+        # sorted so the same set always makes the same batches, which lets concurrent lookups share them
+        project_ids = sorted(set(project_ids))
+        projects = []
+        for start in range(0, len(project_ids), 100):
+            result = await self.fetch_modrinth_batch('projects_modrinth', project_ids[start:start + 100], priority)
+            if isinstance(result, dict):
+                logger.error(f"Error fetching Modrinth projects: {result.get('error')}")
+                continue
+            projects.extend(result)
+
+        team_ids = sorted({project['team'] for project in projects if project.get('team')})
+        owners = {}
+        for start in range(0, len(team_ids), 100):
+            result = await self.fetch_modrinth_batch('teams_modrinth', team_ids[start:start + 100], priority)
+            if isinstance(result, dict):
+                logger.error(f"Error fetching Modrinth teams: {result.get('error')}")
+                continue
+            for members in result:
+                owner = next((member for member in members if member.get('role') == "Owner"),
+                             members[0] if members else None)
+                if owner:
+                    owners[owner['team_id']] = owner.get('user', {}).get('username', "Unknown Author")
+
+        return {project['id']: self.convert_to_unified({**project, "author": owners.get(project.get('team'))},
+                                                       "modrinth_project")
+                for project in projects}
+
+    async def fetch_modrinth_batch(self, url_name, ids, priority=PRIORITY_BACKGROUND):
+        return await self.singleflight.do((url_name, tuple(ids)), lambda: fetch(
+            self.config['urls'][url_name], self.http, headers=self.modrinth_headers(), params={"ids": json.dumps(ids)},
+            scheduler=self.scheduler, source="modrinth", priority=priority, cache=self.response_cache))
+
+    async def authenticate_hangar(self):
+        return await self.hangar_auth.get_token(self.http)
+
+    async def fetch_hangar(self, url, params=None, priority=PRIORITY_BACKGROUND, cache_ttl=None, revalidate=False):
+        # Re-authenticate once if Hangar rejects a cached token. Tokens rotate, so cached responses are
+        # scoped to the API key rather than to the Authorization header
+        cache_scope = "hangar:" + hashlib.sha256(self.config['api_keys']['hangar'].encode('utf-8')).hexdigest()[:16]
+        for attempt in range(2):
+            token = await self.authenticate_hangar()
+            if not token:
+                return None
+            result = await fetch(url, self.http, headers={
+                "Authorization": f"Bearer {token}",
+                "User-Agent": self.config['user_agent']
+            }, params=params, scheduler=self.scheduler, source="hangar", priority=priority,
+                cache=self.response_cache, cache_scope=cache_scope, cache_ttl=cache_ttl, revalidate=revalidate)
+            if result.get('status_code') != 401:
+                return result
+            await self.hangar_auth.invalidate(token)
+        return result
 
     def convert_to_unified(self, data, source):
         if source == "modrinth":
@@ -190,6 +413,22 @@ class PluginManager:
                 "url": f"https://modrinth.com/mod/{data.get('slug', '')}",
                 "source": source
             }
+        elif source == "modrinth_project":
+            # Full project objects from /v2/project(s), as opposed to search hits
+            return {
+                "name": normalize_name(data.get("title") or ""),
+                "title": data.get("title") or "",
+                "description": data.get("description") or "",
+                "author": data.get("author") or "Unknown Author",
+                "date_created": data.get("published") or "",
+                "date_modified": data.get("updated") or "",
+                "icon_url": data.get("icon_url") or "",
+                "category": (data.get("categories") or [""])[0],
+                "downloads": data.get("downloads", 0),
+                "follows": data.get("followers", 0),
+                "url": f"https://modrinth.com/{data.get('project_type') or 'mod'}/{data.get('slug', '')}",
+                "source": "modrinth"
+            }
         elif source == "hangar":
             return {
                 "name": normalize_name(data.get("name", "")),
@@ -206,65 +445,288 @@ class PluginManager:
                 "source": source
             }
 
-    async def check_plugins(self, folder_path):
-        plugins = scan_folder(folder_path)
-        self.state.clear_plugins()
+    async def _resolved_events(self, entries, plugins_by_name, progress, icons=None, failed=()):
+        # entries are (state, record, lookup name) triples; every jar is recorded in its folder's state as its event
+        # is produced. Rows never wait for a download: icons already cached are filled in, the rest are fetched in
+        # the background and reported later through _icon_events. Unmatched names in failed are recorded as not
+        # found but reported as "failed", since a source never answered for them
+        if icons is not None and plugins_by_name:
+            urls = [url for url in dict.fromkeys(plugin_data['icon_url'] for plugin_data in plugins_by_name.values())
+                    if url and url not in icons['paths'] and url not in icons['requested']]
+            if urls:
+                icons['paths'].update(await self.icon_cache.fetch_many(self.http, urls, download=False))
+                missing = [url for url in urls if url not in icons['paths']]
+                if missing:
+                    icons['requested'].update(missing)
+                    icons['tasks'].add(asyncio.ensure_future(self._fetch_icons(missing)))
+        events = []
+        for state, record, name in entries:
+            plugin_name = record['stem']
+            plugin_data = plugins_by_name.get(name)
+            folder = os.path.dirname(record['path'])
+            progress['done'] += 1
+            if plugin_data:
+                icon_url = plugin_data['icon_url']
+                image_filepath = icons['paths'].get(icon_url) if icons is not None else None
+                if icons is not None and icon_url in icons['requested'] and image_filepath is None:
+                    icons['waiting'].setdefault(icon_url, []).append((state, len(state.found_plugins), folder))
+                plugin = (plugin_name, plugin_data['date_modified'], plugin_data['title'], plugin_data['url'],
+                          plugin_data, image_filepath)
+                state.add_found_plugin(plugin)
+                status = "found"
+            else:
+                plugin = (plugin_name, record['version'])
+                state.add_not_found_plugin(plugin)
+                status = "failed" if name in failed else "not_found"
+            events.append({"status": status, "plugin": plugin, "folder": folder, **progress})
+        return events
+
+    async def _fetch_icons(self, urls):
+        with metrics.span("icons"):
+            return await self.icon_cache.fetch_many(self.http, urls)
+
+    def _icon_events(self, icons, progress):
+        # One "icon" event per found jar whose icon finished downloading, carrying the plugin with its icon set
+        events = []
+        if icons is None:
+            return events
+        for task in [task for task in icons['tasks'] if task.done()]:
+            icons['tasks'].discard(task)
+            if task.cancelled() or task.exception() is not None:
+                continue
+            for url, image_filepath in task.result().items():
+                icons['paths'][url] = image_filepath
+                for state, position, folder in icons['waiting'].pop(url, []):
+                    plugin = state.found_plugins[position] if position < len(state.found_plugins) else None
+                    if plugin is None or plugin[4]['icon_url'] != url:
+                        continue
+                    plugin = plugin[:5] + (image_filepath,)
+                    state.found_plugins[position] = plugin
+                    events.append({"status": "icon", "plugin": plugin, "folder": folder, **progress})
+        return events
+
+    async def iter_plugins(self, folder_path, cache_only=False, fetch_icons=True):
+        # Yields {"status": "found" | "not_found" | "failed", "plugin": ..., "folder": ..., "done": n, "total": n}
+        # per jar as soon as it resolves: cached and hash-identified jars first, then searches in completion order.
+        # "failed" jars could not be searched because a source did not answer; like not found jars they are shown
+        # without plugin data. Found jars whose icon was not cached yet get a later "icon" event with the same plugin
+        # and its icon set. Closing the generator or cancelling its consumer cancels the searches still in flight.
+        # With cache_only, jars the caches cannot resolve are reported as not found without any network request and
+        # nothing is written back
+        async with aclosing(self.iter_folders([(self.state, folder_path)], cache_only, fetch_icons)) as events:
+            async for event in events:
+                yield event
+
+    async def iter_folders(self, folders, cache_only=False, fetch_icons=True):
+        # Like iter_plugins for several (state, folder) pairs at once, as a Workspace scans its servers. The folders
+        # are read concurrently and every jar is recorded in its own state, but each distinct plugin is looked up,
+        # identified and searched once for all of them
+        icons = {"paths": {}, "requested": set(), "waiting": {}, "tasks": set()} if fetch_icons and not cache_only \
+            else None
+        try:
+            async with aclosing(self._scan_folders(folders, cache_only, icons)) as events:
+                async for event in events:
+                    yield event
+        finally:
+            for task in (icons or {}).get('tasks', ()):
+                task.cancel()
 
+    async def _scan_folders(self, folders, cache_only, icons):
+        checkpoint = metrics.checkpoint()
+        coalesced = self.singleflight.stats['coalesced']
+        with metrics.span("scan_folder"):
+            scans = await asyncio.gather(*[self.jar_scanner.scan(folder_path) for _, folder_path in folders],
+                                         return_exceptions=True)
+        entries = []
+        for (state, folder_path), records in zip(folders, scans):
+            if isinstance(records, Exception):
+                logger.error(f"Error scanning {folder_path}: {records}")
+                records = []
+            state.clear_plugins()
+            state.set_jar_records(records)
+            entries.extend((state, record, normalize_name(record['name'])) for record in records)
+        metrics.increment("jars_total", len(entries))
+        progress = {"done": 0, "total": len(entries)}
+
+        # Resolve the cache state of every distinct name in one round-trip before any network work
+        with metrics.span("cache_lookup"):
+            cached, known_missing = await self.lookup_plugins(dict.fromkeys(name for _, _, name in entries))
+        ready = [entry for entry in entries if entry[2] in cached]
+        metrics.increment("jars_resolved_total", len(ready), via="cache")
+        for event in await self._resolved_events(ready, cached, progress, icons):
+            yield event
+        for event in self._icon_events(icons, progress):
+            yield event
+
+        # Identify uncached jars by file hash in a few bulk requests, including names cached as matching no search;
+        # only the rest fall back to search
+        unresolved = [entry for entry in entries if entry[2] not in cached]
+        if cache_only:
+            for event in await self._resolved_events(unresolved, {}, progress, icons):
+                yield event
+            for event in self._icon_events(icons, progress):
+                yield event
+            metrics.export("scan", checkpoint)
+            return
+        identified = {}
+        if unresolved and self.identification_config['mode'] == "hash":
+            names_by_path = {record['path']: name for _, record, name in unresolved}
+            with metrics.span("identify_by_hash"):
+                identified = {names_by_path[path]: plugin_data for path, plugin_data in
+                              (await self.identify_by_hash([record for _, record, _ in unresolved])).items()}
+            hashed = [entry for entry in unresolved if entry[2] in identified]
+            metrics.increment("jars_resolved_total", len(hashed), via="hash")
+            await self.insert_or_update_plugins(identified)
+            for event in await self._resolved_events(hashed, identified, progress, icons):
+                yield event
+            for event in self._icon_events(icons, progress):
+                yield event
+
+        # Names already known to match no search are not searched again until that entry expires
+        known_misses = [entry for entry in unresolved if entry[2] not in identified and entry[2] in known_missing]
+        metrics.increment("jars_resolved_total", len(known_misses), via="cache")
+        for event in await self._resolved_events(known_misses, {}, progress, icons):
+            yield event
+        for event in self._icon_events(icons, progress):
+            yield event
+
+        # Background scans queue behind interactive searches; the scheduler bounds concurrency
+        misses = {}
+        for entry in unresolved:
+            if entry[2] not in identified and entry[2] not in known_missing:
+                misses.setdefault(entry[2], []).append(entry)
+
+        async def search(name):
+            # results is None when a source failed; such names are reported as failed and not cached as missing
+            try:
+                results, _ = await self.search_plugin(misses[name][0][1]['name'], priority=PRIORITY_BACKGROUND,
+                                                      use_cache=False)
+            except Exception as e:
+                logger.error(f"Error searching for {name}: {e}")
+                results = None
+            if results is None:
+                failed.add(name)
+            return name, results[0] if results else None
+
+        tasks = [asyncio.ensure_future(search(name)) for name in misses]
+        searched = {}
+        failed = set()
+        answered = set()
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                name, plugin_data = await next_result
+                answered.add(name)
+                resolved = {name: plugin_data} if plugin_data else {}
+                via = "search" if plugin_data else "failed" if name in failed else "not_found"
+                metrics.increment("jars_resolved_total", len(misses[name]), via=via)
+                searched.update(resolved)
+                for event in await self._resolved_events(misses[name], resolved, progress, icons, failed):
+                    yield event
+                for event in self._icon_events(icons, progress):
+                    yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Searches that finished are written back even when the scan is cancelled: every new match, and every
+            # name every source answered without a match, in pipelined batches
+            with metrics.span("write_back"):
+                await self.insert_or_update_plugins(searched)
+                await self.mark_plugins_not_found(name for name in answered if name not in searched and
+                                                  name not in failed)
+
+        # Icons still downloading are waited for, so every found jar ends up with its icon
+        if icons is not None and icons['tasks']:
+            await asyncio.wait(icons['tasks'])
+            for event in self._icon_events(icons, progress):
+                yield event
+
+        with metrics.span("write_back"):
+            # A complete scan is merged into the snapshot used when Redis is unavailable at startup
+            await self.catalog.save({**cached, **identified, **searched}, self.serialize_plugin)
+            await self.store.upsert_many(cached.values())
+        if self.singleflight.stats['coalesced'] > coalesced:
+            logger.info(f"{self.singleflight.stats['coalesced'] - coalesced} lookups joined one already in flight")
+        metrics.export("scan", checkpoint)
+
+    async def check_plugins(self, folder_path):
         try:
-            async with http_session() as session:
-                tasks = [self.search_plugin(plugin_name) for plugin_name, _ in plugins]
-                results_with_sources = await asyncio.gather(*tasks)
-
-                for (plugin_name, plugin_version), (results, source) in zip(plugins, results_with_sources):
-                    best_match = get_best_match(plugin_name, results)
-                    if best_match:
-                        plugin_data = await self.get_plugin_from_db(normalize_name(plugin_name))
-                        if not plugin_data:
-                            plugin_data = best_match
-                            await self.insert_or_update_plugin(plugin_data)
-
-                        image_filepath = None
-                        if plugin_data['icon_url']:
-                            file_ext = os.path.splitext(plugin_data['icon_url'])[-1].split('?')[0]
-                            image_filepath = os.path.join(self.config['paths']['cache_dir'],
-                                                          f"{normalize_name(plugin_name)}{file_ext}")
-                            if not os.path.exists(image_filepath):
-                                await download_image(plugin_data['icon_url'], image_filepath)
-
-                        self.state.add_found_plugin((plugin_name, plugin_data['date_modified'], plugin_data['title'],
-                                                     plugin_data['url'], plugin_data, image_filepath))
-                    else:
-                        self.state.add_not_found_plugin((plugin_name, plugin_version))
+            async for _ in self.iter_plugins(folder_path):
+                pass
         except Exception as e:
             logger.error(f"Error checking plugins: {e}")
             logger.error(traceback.format_exc())
 
         return self.state.found_plugins, self.state.not_found_plugins
 
-    async def check_for_updates(self, found_plugins):
-        updates = []
+    async def check_for_updates(self, found_plugins, state=None):
+        # Returns one dict per plugin that could be checked, with "update_available" set where a newer file exists
         try:
-            for plugin in found_plugins:
-                plugin_name, current_version, mod_name, project_id, plugin_data, _ = plugin
-                latest_version = plugin_data.get('latest_version', "Unknown Date")
-                if latest_version != current_version:
-                    updates.append((plugin_name, current_version, latest_version, latest_version))
-
-            return updates
+            with metrics.span("check_updates"):
+                return await self.update_checker.check(found_plugins, state=state)
         except Exception as e:
             logger.error(f"Error checking updates: {e}")
-            return updates
+            logger.error(traceback.format_exc())
+            return []
 
-    async def download_plugin(self, url, destination):
+    async def download_plugin(self, url, destination, expected_hash=None, progress=None):
         try:
-            async with http_session() as session:
-                async with session.stream("GET", url) as download_response:
-                    download_response.raise_for_status()
-                    with open(destination, 'wb') as f:
-                        async for chunk in download_response.aiter_bytes():
-                            f.write(chunk)
+            return await self.downloads.download(self.http, url, destination, expected_hash, progress)
         except Exception as e:
             logger.error(f"Error downloading plugin: {e}")
+            return False
+
+    async def update_plugins(self, updates, progress=None):
+        updated = []
+        async with aclosing(self.iter_updates(updates, progress)) as results:
+            async for result in results:
+                if result['error'] is None:
+                    updated.append(result['update'])
+        return updated
+
+    async def iter_updates(self, updates, progress=None):
+        # Downloads every available update side by side and yields {"update", "destination", "error"} as each one
+        # finishes; the old jar is only removed once its replacement has been verified and moved into place. A file
+        # several servers update to is downloaded once and copied to the others
+        jobs = {}
+        for update in updates:
+            if not update.get('update_available') or not update.get('file_url'):
+                continue
+            destination = self._update_destination(update)
+            if update['file_url'] in jobs:
+                jobs[update['file_url']]['copies'].append((update, destination))
+                continue
+            jobs[update['file_url']] = {"url": update['file_url'], "destination": destination,
+                                        "hash": update.get('hash'), "update": update, "copies": []}
+
+        async with aclosing(self.downloads.iter_download_many(self.http, list(jobs.values()), progress)) as results:
+            async for job, error in results:
+                for update, destination in [(job['update'], job['destination']), *job['copies']]:
+                    result_error = error
+                    if error is None and destination != job['destination']:
+                        try:
+                            await asyncio.to_thread(copy_file, job['destination'], destination)
+                        except OSError as e:
+                            result_error = e
+                    if result_error is None:
+                        await self._remove_replaced(update['path'], destination)
+                    yield {"update": update, "destination": destination,
+                           "error": str(result_error) if result_error is not None else None}
+
+    @staticmethod
+    def _update_destination(update):
+        # The file name comes from the API; anything but a plain jar name keeps the old jar's name, so a download
+        # can never land outside the plugin folder
+        file_name = os.path.basename(update.get('file_name') or "")
+        if file_name in ("", ".", "..") or not file_name.lower().endswith(".jar"):
+            file_name = os.path.basename(update['path'])
+        return os.path.join(os.path.dirname(update['path']), file_name)
+
+    async def _remove_replaced(self, old_path, destination):
+        if os.path.abspath(old_path) != os.path.abspath(destination):
+            try:
+                await asyncio.to_thread(os.remove, old_path)
+            except OSError as e:
+                logger.warning(f"Could not remove old jar {old_path}: {e}")
 
     async def load_plugins(self):
         self.state.set_loading(True)
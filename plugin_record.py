@@ -0,0 +1,151 @@
+import struct
+from collections.abc import Mapping
+
+# Field order of the Plugin table in plugin.fbs; field i lives at vtable offset 4 + 2 * i
+FIELDS = ("name", "title", "description", "author", "date_created", "date_modified", "icon_url", "category",
+          "downloads", "follows", "url", "source")
+INT_FIELDS = frozenset(("downloads", "follows"))
+FIELD_INDEX = {field: index for index, field in enumerate(FIELDS)}
+
+STRING_FIELDS = tuple(field for field in FIELDS if field not in INT_FIELDS)
+
+# Every Plugin written by PluginSerializer.serialize has the same shape: root offset, one vtable, a table with
+# all twelve fields in schema order, then the strings. Packing that with struct skips the per-field Builder calls
+_VTABLE_POS = 4
+_TABLE_POS = _VTABLE_POS + 4 + 2 * len(FIELDS)
+_TABLE_SIZE = 4 + 4 * len(FIELDS)
+_STRINGS_POS = _TABLE_POS + _TABLE_SIZE
+_HEADER = struct.pack(f"<I{2 + len(FIELDS)}H", _TABLE_POS, 4 + 2 * len(FIELDS), _TABLE_SIZE,
+                      *(4 + 4 * index for index in range(len(FIELDS))))
+_TABLE = struct.Struct("<i8I2i2I")
+_STRING_SLOTS = [_TABLE_POS + 4 + 4 * FIELDS.index(field) for field in STRING_FIELDS]
+# NUL terminator plus padding, by string length modulo 4
+_PADDING = (b"\0\0\0\0", b"\0\0\0", b"\0\0", b"\0")
+
+_UOFFSET = struct.Struct("<I")
+_SOFFSET = struct.Struct("<i")
+_VOFFSET = struct.Struct("<H")
+_INT32 = struct.Struct("<i")
+
+_UNSET = object()
+
+
+class PluginRecord(Mapping):
+    # Read-only view of a serialized Plugin table. Nothing is decoded up front; each field is read from the
+    # buffer on first access and memoized, so a list row touching title, date and icon never decodes the rest
+    __slots__ = ("_buf", "_pos", "_slots", "_values", "_data")
+
+    def __init__(self, buf, pos, data=None):
+        self._buf = buf
+        self._pos = pos
+        self._slots = None
+        self._values = [_UNSET] * len(FIELDS)
+        # The finished buffer when this record is its root, so it can be stored again without rebuilding
+        self._data = data
+
+    @classmethod
+    def from_bytes(cls, data):
+        buf = memoryview(data)
+        return cls(buf, _UOFFSET.unpack_from(buf, 0)[0], data)
+
+    def _field_slots(self):
+        # Field offsets from the vtable, read once per record; fields beyond the vtable are absent
+        buf, pos = self._buf, self._pos
+        vtable = pos - _SOFFSET.unpack_from(buf, pos)[0]
+        count = min((_VOFFSET.unpack_from(buf, vtable)[0] - 4) // 2, len(FIELDS))
+        self._slots = struct.unpack_from(f"<{count}H", buf, vtable + 4) + (0,) * (len(FIELDS) - count)
+        return self._slots
+
+    def _decode(self, index):
+        offset = (self._slots or self._field_slots())[index]
+        if FIELDS[index] in INT_FIELDS:
+            return _INT32.unpack_from(self._buf, self._pos + offset)[0] if offset else 0
+        if not offset:
+            return ""
+        position = self._pos + offset
+        start = position + _UOFFSET.unpack_from(self._buf, position)[0]
+        length = _UOFFSET.unpack_from(self._buf, start)[0]
+        return str(self._buf[start + 4:start + 4 + length], 'utf-8')
+
+    def __getitem__(self, key):
+        index = FIELD_INDEX[key]
+        value = self._values[index]
+        if value is _UNSET:
+            value = self._values[index] = self._decode(index)
+        return value
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __contains__(self, key):
+        return key in FIELD_INDEX
+
+    def __repr__(self):
+        return f"PluginRecord({self.to_dict()!r})"
+
+    def to_bytes(self):
+        return bytes(self._data) if self._data is not None else None
+
+    def to_dict(self):
+        return {field: self[field] for field in FIELDS}
+
+
+class PluginSerializer:
+    # serialize() packs the fixed Plugin layout directly; build() adds a table to a caller's Builder, for
+    # buffers that hold more than one record. Only the Builder paths need the flatbuffers package (which also
+    # imports numpy when it is installed), so it is imported there rather than at startup
+    def __init__(self, initial_size=1024):
+        self.initial_size = initial_size
+        self.builder = None
+
+    def build(self, builder, plugin_data):
+        from PluginManager import Plugin as FlatbufferPlugin
+        # Strings must be created before StartObject
+        strings = {field: builder.CreateString(plugin_data[field] or "") for field in STRING_FIELDS}
+        FlatbufferPlugin.PluginStart(builder)
+        FlatbufferPlugin.PluginAddName(builder, strings['name'])
+        FlatbufferPlugin.PluginAddTitle(builder, strings['title'])
+        FlatbufferPlugin.PluginAddDescription(builder, strings['description'])
+        FlatbufferPlugin.PluginAddAuthor(builder, strings['author'])
+        FlatbufferPlugin.PluginAddDateCreated(builder, strings['date_created'])
+        FlatbufferPlugin.PluginAddDateModified(builder, strings['date_modified'])
+        FlatbufferPlugin.PluginAddIconUrl(builder, strings['icon_url'])
+        FlatbufferPlugin.PluginAddCategory(builder, strings['category'])
+        FlatbufferPlugin.PluginAddDownloads(builder, plugin_data['downloads'] or 0)
+        FlatbufferPlugin.PluginAddFollows(builder, plugin_data['follows'] or 0)
+        FlatbufferPlugin.PluginAddUrl(builder, strings['url'])
+        FlatbufferPlugin.PluginAddSource(builder, strings['source'])
+        return FlatbufferPlugin.PluginEnd(builder)
+
+    def serialize_with_builder(self, plugin_data):
+        if self.builder is None:
+            import flatbuffers
+            self.builder = flatbuffers.Builder(self.initial_size)
+        builder = self.builder
+        builder.Clear()
+        builder.Finish(self.build(builder, plugin_data))
+        return bytes(builder.Output())
+
+    def serialize(self, plugin_data):
+        # Records read from a buffer are stored as they are
+        if isinstance(plugin_data, PluginRecord) and plugin_data.to_bytes() is not None:
+            return plugin_data.to_bytes()
+        chunks = [_HEADER, None]
+        offsets = []
+        position = _STRINGS_POS
+        for field, slot in zip(STRING_FIELDS, _STRING_SLOTS):
+            encoded = (plugin_data[field] or "").encode('utf-8')
+            offsets.append(position - slot)
+            # Length prefix, bytes, then terminator and padding so the next length prefix stays 4-byte aligned
+            padding = _PADDING[len(encoded) % 4]
+            chunks += (struct.pack("<I", len(encoded)), encoded, padding)
+            position += 4 + len(encoded) + len(padding)
+        chunks[1] = _TABLE.pack(_TABLE_POS - _VTABLE_POS, *offsets[:8], plugin_data['downloads'] or 0,
+                                plugin_data['follows'] or 0, *offsets[8:])
+        return b"".join(chunks)
+
+    def serialize_many(self, plugins):
+        return [self.serialize(plugin_data) for plugin_data in plugins]
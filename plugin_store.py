@@ -0,0 +1,158 @@
+import os
+import re
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+
+SORT_ORDERS = {
+    "relevance": None,
+    "downloads": "p.downloads DESC",
+    "follows": "p.follows DESC",
+    "updated": "p.date_modified DESC",
+    "title": "p.title COLLATE NOCASE"
+}
+FTS_COLUMNS = ("name", "title", "author", "description")
+
+
+def _match_query(text):
+    # Every word must match as a prefix; quoting keeps FTS5 operators in user input literal
+    words = re.findall(r"\w+", text, re.UNICODE)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class PluginStore:
+    # SQLite store for plugin metadata, with the plugins table generated from config db_schema. One connection
+    # lives on a single worker thread; the fixed SQL strings below are prepared once and reused from sqlite3's
+    # statement cache
+    def __init__(self, db_path, db_schema):
+        self.db_path = db_path
+        self.columns = {name: kind for name, kind in db_schema.get('plugins', {}).items()}
+        self.data_columns = [name for name in self.columns if name != 'id']
+        self.fts = False
+        self._connection = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plugin-store")
+
+        placeholders = ", ".join("?" for _ in self.data_columns)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in self.data_columns if name not in ('source', 'name'))
+        self._upsert_sql = f"INSERT INTO plugins ({', '.join(self.data_columns)}) VALUES ({placeholders}) " \
+                           f"ON CONFLICT(source, name) DO UPDATE SET {updates}"
+
+    def _connect(self):
+        if self._connection is not None:
+            return self._connection
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        connection = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=64)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+
+        definition = ", ".join(f"{name} {kind}" for name, kind in self.columns.items())
+        with connection:
+            connection.execute(f"CREATE TABLE IF NOT EXISTS plugins ({definition})")
+            connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS plugins_source_name ON plugins (source, name)")
+            connection.execute("CREATE INDEX IF NOT EXISTS plugins_category ON plugins (category)")
+            connection.execute("CREATE INDEX IF NOT EXISTS plugins_downloads ON plugins (downloads)")
+            connection.execute("CREATE INDEX IF NOT EXISTS plugins_follows ON plugins (follows)")
+        self.fts = self._create_fts(connection)
+        self._connection = connection
+        logger.info(f"Plugin store opened at {self.db_path} (full-text search {'on' if self.fts else 'off'})")
+        return connection
+
+    def _create_fts(self, connection):
+        # External-content FTS5 index kept in step by triggers; without FTS5 searches fall back to LIKE
+        columns = ", ".join(FTS_COLUMNS)
+        new_values = ", ".join(f"new.{name}" for name in FTS_COLUMNS)
+        old_values = ", ".join(f"old.{name}" for name in FTS_COLUMNS)
+        try:
+            with connection:
+                connection.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS plugins_fts USING fts5({columns}, "
+                                   f"content='plugins', content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS plugins_fts_insert AFTER INSERT ON plugins BEGIN "
+                                   f"INSERT INTO plugins_fts (rowid, {columns}) VALUES (new.id, {new_values}); END")
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS plugins_fts_delete AFTER DELETE ON plugins BEGIN "
+                                   f"INSERT INTO plugins_fts (plugins_fts, rowid, {columns}) "
+                                   f"VALUES ('delete', old.id, {old_values}); END")
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS plugins_fts_update AFTER UPDATE ON plugins BEGIN "
+                                   f"INSERT INTO plugins_fts (plugins_fts, rowid, {columns}) "
+                                   f"VALUES ('delete', old.id, {old_values}); "
+                                   f"INSERT INTO plugins_fts (rowid, {columns}) VALUES (new.id, {new_values}); END")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite full-text search unavailable, using LIKE: {e}")
+            return False
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _upsert_many(self, plugins):
+        connection = self._connect()
+        rows = [tuple(plugin_data.get(name) for name in self.data_columns) for plugin_data in plugins]
+        with connection:
+            connection.executemany(self._upsert_sql, rows)
+        return len(rows)
+
+    async def upsert_many(self, plugins):
+        # One transaction per batch; duplicates by (source, name) collapse onto the same row
+        unique = {(plugin_data['source'], plugin_data['name']): plugin_data for plugin_data in plugins}
+        if not unique:
+            return 0
+        try:
+            return await self._run(self._upsert_many, list(unique.values()))
+        except Exception as e:
+            logger.error(f"Error writing plugins to the store: {e}")
+            return 0
+
+    def _search(self, query, category, sort, limit):
+        connection = self._connect()
+        conditions = []
+        params = []
+        match = _match_query(query or "")
+        if match and self.fts:
+            source = "plugins_fts JOIN plugins p ON p.id = plugins_fts.rowid"
+            conditions.append("plugins_fts MATCH ?")
+            params.append(match)
+            order = SORT_ORDERS.get(sort) or "bm25(plugins_fts)"
+        else:
+            source = "plugins p"
+            for word in re.findall(r"\w+", query or "", re.UNICODE):
+                conditions.append("(" + " OR ".join(f"p.{name} LIKE ?" for name in FTS_COLUMNS) + ")")
+                params.extend([f"%{word}%"] * len(FTS_COLUMNS))
+            order = SORT_ORDERS.get(sort) or "p.downloads DESC"
+        if category:
+            conditions.append("p.category = ?")
+            params.append(category)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ", ".join(f"p.{name}" for name in self.data_columns)
+        rows = connection.execute(f"SELECT {columns} FROM {source} {where} ORDER BY {order} LIMIT ?",
+                                  (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    async def search(self, query, category=None, sort="relevance", limit=50):
+        try:
+            return await self._run(self._search, query, category, sort, limit)
+        except Exception as e:
+            logger.error(f"Error searching the plugin store: {e}")
+            return []
+
+    def _categories(self):
+        rows = self._connect().execute("SELECT DISTINCT category FROM plugins WHERE category != '' "
+                                       "ORDER BY category").fetchall()
+        return [row[0] for row in rows]
+
+    async def categories(self):
+        try:
+            return await self._run(self._categories)
+        except Exception as e:
+            logger.error(f"Error reading categories from the plugin store: {e}")
+            return []
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def close(self):
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
@@ -1,4 +1,3 @@
-import redis
 from loguru import logger
 
 
@@ -7,18 +6,32 @@ class RedisClient:
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
-            cls._instance = super(RedisClient, cls).__new__(cls, *args, **kwargs)
+            cls._instance = super(RedisClient, cls).__new__(cls)
         return cls._instance
 
     def __init__(self, host='localhost', port=6379, db=0):
         if not hasattr(self, 'initialized'):
-            self.redis_client = redis.StrictRedis(host=host, port=port, db=db)
-            logger.info("Connected to Redis")
+            # The redis package is imported and the client created on first use, keeping both off the startup path
+            self.connection_settings = {"host": host, "port": port, "db": db}
+            self._redis_client = None
             self.initialized = True
 
-    def set(self, key, value):
+    @property
+    def redis_client(self):
+        if self._redis_client is None:
+            import redis
+            self._redis_client = redis.StrictRedis(**self.connection_settings)
+            logger.info(f"Redis client created for {self.connection_settings['host']}:"
+                        f"{self.connection_settings['port']}/{self.connection_settings['db']}")
+        return self._redis_client
+
+    @redis_client.setter
+    def redis_client(self, client):
+        self._redis_client = client
+
+    def set(self, key, value, ex=None):
         try:
-            self.redis_client.set(key, value)
+            self.redis_client.set(key, value, ex=ex)
         except Exception as e:
             logger.error(f"Error saving to Redis: {e}")
 
@@ -30,6 +43,27 @@ class RedisClient:
             logger.error(f"Error loading from Redis: {e}")
             return None
 
+    def mget(self, keys):
+        if not keys:
+            return []
+        try:
+            return self.redis_client.mget(keys)
+        except Exception as e:
+            logger.error(f"Error loading from Redis: {e}")
+            return [None] * len(keys)
+
+    def set_many(self, mapping, ex=None):
+        if not mapping:
+            return
+        try:
+            # One round-trip for the whole batch; atomicity is not needed here
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipeline.set(key, value, ex=ex)
+            pipeline.execute()
+        except Exception as e:
+            logger.error(f"Error saving to Redis: {e}")
+
     def delete(self, key):
         try:
             self.redis_client.delete(key)
@@ -41,3 +75,88 @@ class RedisClient:
             self.redis_client.flushdb()
         except Exception as e:
             logger.error(f"Error clearing Redis database: {e}")
+
+
+class AsyncRedisClient:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(AsyncRedisClient, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, host='localhost', port=6379, db=0, max_connections=20):
+        if not hasattr(self, 'initialized'):
+            self.connection_settings = {"host": host, "port": port, "db": db, "max_connections": max_connections}
+            self.pool = None
+            self._redis_client = None
+            self.initialized = True
+
+    @property
+    def redis_client(self):
+        # The pool is built on first use; its connections are then opened lazily on the running event loop
+        if self._redis_client is None:
+            import redis.asyncio
+            self.pool = redis.asyncio.ConnectionPool(**self.connection_settings)
+            self._redis_client = redis.asyncio.StrictRedis(connection_pool=self.pool)
+            logger.info(f"Async Redis client configured for {self.connection_settings['host']}:"
+                        f"{self.connection_settings['port']}/{self.connection_settings['db']}")
+        return self._redis_client
+
+    @redis_client.setter
+    def redis_client(self, client):
+        self._redis_client = client
+
+    async def set(self, key, value, ex=None):
+        try:
+            await self.redis_client.set(key, value, ex=ex)
+        except Exception as e:
+            logger.error(f"Error saving to Redis: {e}")
+
+    async def get(self, key):
+        try:
+            value = await self.redis_client.get(key)
+            return value if value else None
+        except Exception as e:
+            logger.error(f"Error loading from Redis: {e}")
+            return None
+
+    async def mget(self, keys):
+        if not keys:
+            return []
+        try:
+            return await self.redis_client.mget(keys)
+        except Exception as e:
+            logger.error(f"Error loading from Redis: {e}")
+            return [None] * len(keys)
+
+    async def set_many(self, mapping, ex=None):
+        if not mapping:
+            return
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipeline.set(key, value, ex=ex)
+            await pipeline.execute()
+        except Exception as e:
+            logger.error(f"Error saving to Redis: {e}")
+
+    async def delete(self, key):
+        try:
+            await self.redis_client.delete(key)
+        except Exception as e:
+            logger.error(f"Error deleting from Redis: {e}")
+
+    async def clear(self):
+        try:
+            await self.redis_client.flushdb()
+        except Exception as e:
+            logger.error(f"Error clearing Redis database: {e}")
+
+    async def aclose(self):
+        if self.pool is None:
+            return
+        try:
+            await self.pool.disconnect()
+        except Exception as e:
+            logger.error(f"Error closing Redis connections: {e}")
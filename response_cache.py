@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import zlib
+import asyncio
+import hashlib
+from loguru import logger
+
+DEFAULT_RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "max_bytes": 64 * 1024 * 1024,
+    "default_ttl": 3600,
+    "stale_while_revalidate": 86400,
+    "compression_level": 6
+}
+
+
+def _max_age(response):
+    for directive in response.headers.get('Cache-Control', '').split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() in ('no-store', 'no-cache'):
+            return 0
+        if name.lower() == 'max-age':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+class ResponseCache:
+    # Persistent cache of JSON API responses. Bodies are stored zlib-compressed, one file per entry, with an
+    # index holding validators, freshness and last access for LRU eviction under a byte budget
+    def __init__(self, cache_dir, cache_config=None):
+        self.cache_dir = cache_dir
+        self.cache_config = {**DEFAULT_RESPONSE_CACHE_CONFIG, **(cache_config or {})}
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._index = None
+        self._size = 0
+        self._flush_handle = None
+        self._revalidations = {}
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "not_modified": 0, "misses": 0, "stores": 0,
+                      "evictions": 0}
+
+    @property
+    def enabled(self):
+        return self.cache_config['enabled']
+
+    @staticmethod
+    def make_key(method, url, params=None, scope=None, body=None):
+        parts = [method.upper(), url, json.dumps(params or {}, sort_keys=True, default=str), scope or ""]
+        if body is not None:
+            parts.append(json.dumps(body, sort_keys=True, default=str))
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.z")
+
+    def _load_index(self):
+        index = {}
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r') as f:
+                    index = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading response cache index: {e}")
+        return index
+
+    async def _ensure_index(self):
+        if self._index is None:
+            index = await asyncio.to_thread(self._load_index)
+            if self._index is None:
+                self._index = index
+                self._size = sum(entry['size'] for entry in index.values())
+
+    def _write_index(self, index):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(index, f)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            logger.error(f"Error saving response cache index: {e}")
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(2, self._flush_soon)
+
+    def _flush_soon(self):
+        self._flush_handle = None
+        asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        if self._index is not None:
+            await asyncio.to_thread(self._write_index, dict(self._index))
+
+    def _read_body(self, key):
+        with open(self._body_path(key), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def _write_body(self, key, content):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = zlib.compress(content, self.cache_config['compression_level'])
+        temp_path = f"{self._body_path(key)}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, self._body_path(key))
+        return len(data)
+
+    def _remove_bodies(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    async def lookup(self, key):
+        # Returns (entry, body) or (None, None); the entry says whether the body is fresh or only usable stale
+        await self._ensure_index()
+        entry = self._index.get(key)
+        if entry is None:
+            return None, None
+        try:
+            body = await asyncio.to_thread(self._read_body, key)
+        except Exception:
+            self._drop(key)
+            return None, None
+        entry['accessed'] = time.time()
+        self._schedule_flush()
+        return entry, body
+
+    def freshness(self, entry):
+        age = time.time() - entry['stored']
+        if age < entry['ttl']:
+            return "fresh"
+        if age < entry['ttl'] + self.cache_config['stale_while_revalidate']:
+            return "stale"
+        return "expired"
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers["If-None-Match"] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers["If-Modified-Since"] = entry['last_modified']
+        return headers
+
+    def _drop(self, key):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._size -= entry['size']
+
+    def touch(self, key, response, ttl=None):
+        # A 304 makes the stored body fresh again
+        entry = self._index.get(key)
+        if entry:
+            self.stats["not_modified"] += 1
+            entry['stored'] = time.time()
+            entry['ttl'] = self._ttl(response, ttl)
+            self._schedule_flush()
+
+    def _ttl(self, response, ttl):
+        max_age = _max_age(response)
+        if max_age is not None:
+            return max_age if ttl is None else min(max_age, ttl)
+        return self.cache_config['default_ttl'] if ttl is None else ttl
+
+    async def store(self, key, response, ttl=None):
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+            return
+        await self._ensure_index()
+        try:
+            size = await asyncio.to_thread(self._write_body, key, response.content)
+        except Exception as e:
+            logger.error(f"Error writing response cache entry: {e}")
+            return
+        self._drop(key)
+        now = time.time()
+        self._index[key] = {
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "stored": now,
+            "accessed": now,
+            "ttl": self._ttl(response, ttl),
+            "size": size
+        }
+        self._size += size
+        self.stats["stores"] += 1
+        await self._evict()
+        self._schedule_flush()
+
+    async def _evict(self):
+        if self._size <= self.cache_config['max_bytes']:
+            return
+        evicted = []
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['accessed']):
+            if self._size <= self.cache_config['max_bytes'] * 0.9:
+                break
+            self._drop(key)
+            evicted.append(key)
+        self.stats["evictions"] += len(evicted)
+        await asyncio.to_thread(self._remove_bodies, evicted)
+
+    def revalidate_in_background(self, key, revalidate):
+        # At most one background revalidation per entry; the task is kept referenced until it finishes
+        if key in self._revalidations:
+            return
+        task = asyncio.ensure_future(revalidate())
+        self._revalidations[key] = task
+        task.add_done_callback(lambda _: self._revalidations.pop(key, None))
@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from loguru import logger
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+DEFAULT_SCHEDULER_CONFIG = {
+    "max_concurrency": 16,
+    "max_retries": 2,
+    "default_source": {"rate": 5, "burst": 5},
+    "sources": {
+        "modrinth": {"rate": 5, "burst": 10},
+        "hangar": {"rate": 3, "burst": 6}
+    }
+}
+
+
+def _header_float(response, name):
+    value = response.headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _retry_after(response):
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class PriorityGate:
+    # Concurrency limit where freed slots go to the lowest priority value first, FIFO within a lane
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._waiters = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority=PRIORITY_BACKGROUND):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation landed
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+            raise
+
+    def release(self):
+        # Hand the slot straight to the next waiter instead of decrementing and racing for it
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.paused_until = 0
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._timer = None
+
+    def _refill(self):
+        now = time.monotonic()
+        if now > self.paused_until:
+            elapsed = now - max(self._updated, self.paused_until)
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _ready(self):
+        return self.tokens >= 1 and time.monotonic() >= self.paused_until
+
+    async def acquire(self, priority=PRIORITY_BACKGROUND):
+        self._refill()
+        if not self._waiters and self._ready():
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens = min(self.burst, self.tokens + 1)
+            else:
+                future.cancel()
+            raise
+
+    def _schedule(self):
+        if self._timer is not None or not self._waiters:
+            return
+        now = time.monotonic()
+        if now < self.paused_until:
+            delay = self.paused_until - now
+        else:
+            delay = max(1 - self.tokens, 0) / self.rate
+        self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _wake(self):
+        self._timer = None
+        self._refill()
+        while self._waiters and self._ready():
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.tokens -= 1
+                future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        self._schedule()
+
+    def pause(self, seconds):
+        self._refill()
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiters:
+            self._schedule()
+
+    def sync(self, remaining, reset):
+        # Never hold more tokens than the server says we have left, and spread them over the window
+        self._refill()
+        if remaining is None:
+            return
+        self.tokens = min(self.tokens, remaining)
+        if reset and reset > 0:
+            if remaining <= 0:
+                self.pause(reset)
+            else:
+                self.rate = min(self.base_rate, remaining / reset)
+        else:
+            self.rate = self.base_rate
+
+
+class RequestScheduler:
+    def __init__(self, scheduler_config=None):
+        scheduler_config = scheduler_config or {}
+        self.scheduler_config = {**DEFAULT_SCHEDULER_CONFIG, **scheduler_config}
+        self.scheduler_config['sources'] = {**DEFAULT_SCHEDULER_CONFIG['sources'],
+                                            **scheduler_config.get('sources', {})}
+        self.gate = PriorityGate(self.scheduler_config['max_concurrency'])
+        self.buckets = {}
+
+    def bucket(self, source):
+        if source not in self.buckets:
+            limits = self.scheduler_config['sources'].get(source, self.scheduler_config['default_source'])
+            self.buckets[source] = TokenBucket(limits['rate'], limits['burst'])
+        return self.buckets[source]
+
+    @asynccontextmanager
+    async def slot(self, source, priority=PRIORITY_BACKGROUND):
+        await self.bucket(source).acquire(priority)
+        await self.gate.acquire(priority)
+        try:
+            yield
+        finally:
+            self.gate.release()
+
+    def observe(self, source, response):
+        bucket = self.bucket(source)
+        bucket.sync(_header_float(response, 'X-Ratelimit-Remaining'),
+                    _header_float(response, 'X-Ratelimit-Reset'))
+        if response.status_code in (429, 503):
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _header_float(response, 'X-Ratelimit-Reset') or 1
+            logger.warning(f"Rate limited by {source}, backing off for {delay:.1f}s")
+            bucket.pause(delay)
+
+    async def run(self, source, send, priority=PRIORITY_BACKGROUND):
+        # send is a zero-argument coroutine factory so the request can be re-issued after a 429
+        for attempt in range(self.scheduler_config['max_retries'] + 1):
+            async with self.slot(source, priority):
+                response = await send()
+            self.observe(source, response)
+            if response.status_code != 429:
+                break
+        return response
@@ -0,0 +1,53 @@
+import asyncio
+from loguru import logger
+from metrics import metrics
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share one task instead of each sending the same request. Keys are tuples
+    # whose first item names the kind of lookup, which is what the statistics are grouped by. A caller that is
+    # cancelled only stops waiting; the shared task is cancelled once its last caller has gone
+    def __init__(self):
+        self._flights = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+        self.kinds = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    def _land(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # A failure nobody is left waiting for is still considered handled
+        if not flight['task'].cancelled():
+            flight['task'].exception()
+
+    async def do(self, key, factory):
+        # factory is a zero-argument coroutine function, only called when no identical call is in flight
+        kind = key[0]
+        counts = self.kinds.setdefault(kind, {"calls": 0, "coalesced": 0})
+        self.stats["calls"] += 1
+        counts["calls"] += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = {"task": asyncio.ensure_future(factory()), "waiters": 0}
+            flight['task'].add_done_callback(lambda _: self._land(key, flight))
+            metrics.increment("singleflight_total", kind=kind, result="leader")
+        else:
+            self.stats["coalesced"] += 1
+            counts["coalesced"] += 1
+            metrics.increment("singleflight_total", kind=kind, result="coalesced")
+            logger.debug(f"Joined in-flight {kind} lookup for {key[1:]}")
+
+        flight['waiters'] += 1
+        try:
+            return await asyncio.shield(flight['task'])
+        except asyncio.CancelledError:
+            if flight['waiters'] == 1 and not flight['task'].done():
+                flight['task'].cancel()
+                # Callers arriving before the task has wound down start a fresh flight instead of joining this one
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+        finally:
+            flight['waiters'] -= 1
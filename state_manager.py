@@ -5,12 +5,16 @@ from config import Config
 
 class State:
     def __init__(self):
-        self.redis_client = RedisClient()
         self.config = Config().config
+        # Synchronous client, only used for startup state
+        redis_config = self.config.get('redis', {})
+        self.redis_client = RedisClient(redis_config.get('host', 'localhost'), redis_config.get('port', 6379),
+                                        redis_config.get('db', 0))
         self.plugin_folder = self.config.get('paths', {}).get('plugin_folder', 'plugins')
         self.loading = False
         self.found_plugins = []
         self.not_found_plugins = []
+        self.jar_records = {}
 
     def set_plugin_folder(self, folder_path):
         self.plugin_folder = folder_path
@@ -24,6 +28,13 @@ class State:
     def clear_plugins(self):
         self.found_plugins = []
         self.not_found_plugins = []
+        self.jar_records = {}
+
+    def set_jar_records(self, records):
+        self.jar_records = {record['stem']: record for record in records}
+
+    def get_jar_record(self, plugin_name):
+        return self.jar_records.get(plugin_name)
 
     def add_found_plugin(self, plugin):
         self.found_plugins.append(plugin)
@@ -0,0 +1,163 @@
+import asyncio
+from urllib.parse import urlparse
+from loguru import logger
+from scheduler import PRIORITY_BACKGROUND
+
+DEFAULT_UPDATES_CONFIG = {
+    "loaders": ["paper", "spigot", "bukkit"],
+    "game_versions": [],
+    "hangar_channel": "Release",
+    "hangar_platform": "PAPER",
+    "batch_size": 500
+}
+
+
+def hangar_slug(plugin_data):
+    # Hangar project URLs look like https://hangar.papermc.io/<owner>/<slug>
+    parts = [part for part in urlparse(plugin_data.get('url', '')).path.split('/') if part]
+    return parts[-1] if parts else None
+
+
+class UpdateChecker:
+    def __init__(self, plugin_manager):
+        self.plugin_manager = plugin_manager
+        self.config = plugin_manager.config
+        self.updates_config = {**DEFAULT_UPDATES_CONFIG, **self.config.get('updates', {})}
+        self.not_modified = 0
+        # Lookups of the last check that got no answer, as {"source", "error", "paths"}; those jars were not checked
+        self.failed = []
+
+    async def _check_modrinth(self, records, priority, failed):
+        # One POST per batch asks Modrinth for the newest compatible version of every known hash; a batch that fails
+        # is added to failed with the paths of its jars
+        manager = self.plugin_manager
+        batch_size = self.updates_config['batch_size']
+        hashes = list(dict.fromkeys(record['sha1'] for record in records if record.get('sha1')))
+        latest = {}
+        for start in range(0, len(hashes), batch_size):
+            body = {"hashes": hashes[start:start + batch_size], "algorithm": "sha1",
+                    "loaders": self.updates_config['loaders']}
+            if self.updates_config['game_versions']:
+                body["game_versions"] = self.updates_config['game_versions']
+            result = await manager.fetch_modrinth_update(body, priority)
+            if 'error' in result:
+                logger.error(f"Error checking Modrinth updates: {result['error']}")
+                batch = set(body['hashes'])
+                failed.append({"source": "modrinth", "error": str(result['error']),
+                               "paths": [record['path'] for record in records if record.get('sha1') in batch]})
+                continue
+            latest.update(result)
+
+        results = {}
+        for record in records:
+            version = latest.get(record.get('sha1'))
+            if not version:
+                continue
+            files = version.get('files', [])
+            primary = next((f for f in files if f.get('primary')), files[0] if files else {})
+            file_hashes = primary.get('hashes', {})
+            results[record['path']] = {
+                "source": "modrinth",
+                "latest_version": version.get('version_number', ""),
+                "latest_date": version.get('date_published', ""),
+                "file_url": primary.get('url', ""),
+                "file_name": primary.get('filename', ""),
+                "hash": ("sha512", file_hashes['sha512']) if 'sha512' in file_hashes else
+                        ("sha1", file_hashes.get('sha1', "")),
+                "update_available": record['sha1'] not in file_hashes.values()
+            }
+        return results
+
+    async def _latest_hangar(self, slug, priority):
+        # The newest version of one Hangar project, or None when it has none
+        platform = self.updates_config['hangar_platform']
+        url = self.config['urls']['versions_hangar'].format(slug=slug)
+        # Always revalidated against Hangar; the response cache turns an unchanged listing into a 304
+        body = await self.plugin_manager.fetch_hangar(url, {"limit": 1, "offset": 0,
+                                                            "channel": self.updates_config['hangar_channel'],
+                                                            "platform": platform}, priority, revalidate=True)
+        if not body or 'error' in body:
+            raise RuntimeError(body.get('error') if body else "Hangar authentication failed")
+        versions = body.get('result', [])
+        return versions[0] if versions else None
+
+    def _hangar_result(self, record, version):
+        download = version.get('downloads', {}).get(self.updates_config['hangar_platform'], {})
+        file_info = download.get('fileInfo') or {}
+        sha256 = file_info.get('sha256Hash', "")
+        if sha256 and record.get('sha256'):
+            update_available = sha256 != record['sha256']
+        else:
+            update_available = version.get('name', "") != record['version']
+        return {
+            "source": "hangar",
+            "latest_version": version.get('name', ""),
+            "latest_date": version.get('createdAt', ""),
+            "file_url": download.get('downloadUrl') or download.get('externalUrl') or "",
+            "file_name": file_info.get('name', ""),
+            "hash": ("sha256", sha256) if sha256 else None,
+            "update_available": update_available
+        }
+
+    async def check(self, found_plugins, priority=PRIORITY_BACKGROUND, state=None):
+        # found_plugins are the found plugin tuples of one folder, whose jar records are in state
+        state = state if state is not None else self.plugin_manager.state
+        entries = []
+        for plugin in found_plugins:
+            plugin_name, _, title, _, plugin_data, _ = plugin
+            record = state.get_jar_record(plugin_name)
+            if record:
+                entries.append((record, plugin_data, title))
+        return await self.check_entries(entries, priority)
+
+    async def check_entries(self, entries, priority=PRIORITY_BACKGROUND):
+        # entries are (jar record, plugin data, title) triples, possibly from several folders. Each distinct hash and
+        # each Hangar project is asked about once, however many folders hold a copy
+        manager = self.plugin_manager
+        not_modified_before = manager.response_cache.stats["not_modified"]
+        await manager.hash_cache.hash_records([record for record, _, _ in entries], manager.jar_scanner.executor)
+
+        failed = []
+        modrinth_results = await self._check_modrinth([record for record, _, _ in entries], priority, failed)
+        hangar_records = {}
+        for record, plugin_data, _ in entries:
+            slug = hangar_slug(plugin_data)
+            if record['path'] not in modrinth_results and plugin_data.get('source') == "hangar" and slug:
+                hangar_records.setdefault(slug, []).append(record)
+        latest = await asyncio.gather(*[self._latest_hangar(slug, priority) for slug in hangar_records],
+                                      return_exceptions=True)
+        checked = dict(modrinth_results)
+        answered = set(checked)
+        for (slug, records), version in zip(hangar_records.items(), latest):
+            if isinstance(version, Exception):
+                logger.error(f"Error checking Hangar updates for {slug}: {version}")
+                failed.append({"source": "hangar", "error": str(version),
+                               "paths": [record['path'] for record in records]})
+                continue
+            answered.update(record['path'] for record in records)
+            if version:
+                for record in records:
+                    checked[record['path']] = self._hangar_result(record, version)
+
+        results = []
+        for record, plugin_data, title in entries:
+            result = checked.get(record['path'])
+            if result:
+                results.append({
+                    "plugin_name": record['stem'],
+                    "title": title,
+                    "path": record['path'],
+                    "current_version": record['version'],
+                    "current_hash": ("sha1", record.get('sha1', "")),
+                    **result
+                })
+
+        self.not_modified = manager.response_cache.stats["not_modified"] - not_modified_before
+        # A jar of a failed Modrinth batch that Hangar answered for was still checked
+        self.failed = [{**failure, "paths": [path for path in failure['paths'] if path not in answered]}
+                       for failure in failed]
+        self.failed = [failure for failure in self.failed if failure['paths']]
+        logger.info(f"Checked {len(results)} plugins for updates, "
+                    f"{sum(result['update_available'] for result in results)} available, "
+                    f"{self.not_modified} unchanged on Hangar, {len(self.failed)} lookups failed")
+        return results
@@ -0,0 +1,163 @@
+import os
+import json
+import traceback
+from contextlib import aclosing
+from loguru import logger
+from state_manager import State
+from metrics import metrics
+
+DEFAULT_WORKSPACE_CONFIG = {
+    "servers": {}
+}
+
+
+class Workspace:
+    # The plugin folders of a network of servers, each with its own State. Scans go through
+    # PluginManager.iter_folders, so the folders are read concurrently and each distinct plugin is resolved once for
+    # the whole network; found plugins on different servers share the same plugin data
+    REDIS_KEY = 'workspace_servers'
+
+    def __init__(self, plugin_manager, servers=None):
+        self.plugin_manager = plugin_manager
+        self.workspace_config = {**DEFAULT_WORKSPACE_CONFIG, **plugin_manager.config.get('workspace', {})}
+        self.redis_client = plugin_manager.state.redis_client
+        self.servers = {}
+        # Lookups of the last update check that got no answer, one per jar left unchecked, with its server
+        self.update_failures = []
+        for name, folder in (servers or {}).items():
+            self.add_server(folder, name)
+
+    @staticmethod
+    def default_name(folder):
+        # Paper keeps plugins in <server>/plugins, so the server directory names the server
+        folder = os.path.abspath(folder)
+        if os.path.basename(folder).lower() == "plugins":
+            return os.path.basename(os.path.dirname(folder)) or folder
+        return os.path.basename(folder) or folder
+
+    def add_server(self, folder, name=None):
+        # Returns the name the server was registered under; a name already taken gets a numeric suffix
+        base = name or self.default_name(folder)
+        name, suffix = base, 2
+        while name in self.servers:
+            name, suffix = f"{base}-{suffix}", suffix + 1
+        state = State()
+        state.set_plugin_folder(folder)
+        self.servers[name] = state
+        return name
+
+    def remove_server(self, name):
+        self.servers.pop(name, None)
+
+    def folders(self):
+        return {name: state.get_plugin_folder() for name, state in self.servers.items()}
+
+    def load(self):
+        # Blocking; the saved workspace, else the servers in config.json, else the single saved plugin folder. Both
+        # keys come back in one round-trip, which is all a startup with Redis unreachable has to wait for
+        saved, plugin_folder = self.redis_client.mget([self.REDIS_KEY, 'plugin_folder'])
+        servers = {}
+        try:
+            servers = json.loads(saved) if saved else {}
+        except Exception as e:
+            logger.error(f"Error loading workspace: {e}")
+        servers = servers or self.workspace_config['servers']
+        self.servers = {}
+        if servers:
+            for name, folder in servers.items():
+                self.add_server(folder, name)
+        else:
+            state = self.plugin_manager.state
+            if plugin_folder:
+                state.set_plugin_folder(plugin_folder.decode() if isinstance(plugin_folder, bytes) else plugin_folder)
+            self.servers[self.default_name(state.get_plugin_folder())] = state
+        logger.info(f"Workspace loaded with {len(self.servers)} servers")
+
+    def save(self):
+        try:
+            self.redis_client.set(self.REDIS_KEY, json.dumps(self.folders()))
+            logger.info("Workspace saved.")
+        except Exception as e:
+            logger.error(f"Error saving workspace: {e}")
+
+    def server_for_folder(self, folder):
+        folder = os.path.abspath(folder)
+        for name, state in self.servers.items():
+            if os.path.abspath(state.get_plugin_folder()) == folder:
+                return name
+        return None
+
+    async def iter_scan(self, cache_only=False, fetch_icons=True):
+        # Yields the events of PluginManager.iter_folders with the "server" each jar belongs to
+        servers = {os.path.abspath(state.get_plugin_folder()): name for name, state in self.servers.items()}
+        folders = [(state, state.get_plugin_folder()) for state in self.servers.values()]
+        async with aclosing(self.plugin_manager.iter_folders(folders, cache_only, fetch_icons)) as events:
+            async for event in events:
+                yield {**event, "server": servers.get(os.path.abspath(event['folder']))}
+
+    async def scan(self, cache_only=False):
+        try:
+            async for _ in self.iter_scan(cache_only):
+                pass
+        except Exception as e:
+            logger.error(f"Error scanning workspace: {e}")
+            logger.error(traceback.format_exc())
+        return self.summary()
+
+    def server_view(self, name):
+        state = self.servers[name]
+        return state.found_plugins, state.not_found_plugins
+
+    def aggregate_view(self):
+        # One plugin tuple per distinct plugin across the network, with the servers that have it by plugin name
+        found, not_found, servers = {}, {}, {}
+        for name, state in self.servers.items():
+            for plugin in state.found_plugins:
+                key = (plugin[4]['source'], plugin[4]['name'])
+                found.setdefault(key, plugin)
+                servers.setdefault(found[key][0], {})[name] = True
+            for plugin in state.not_found_plugins:
+                not_found.setdefault(plugin[0], plugin)
+                servers.setdefault(plugin[0], {})[name] = True
+        servers = {plugin_name: list(names) for plugin_name, names in servers.items()}
+        return list(found.values()), list(not_found.values()), servers
+
+    def forget_plugin(self, name, plugin_name):
+        # Drops a jar that was removed from a server's folder from that server's view
+        state = self.servers[name]
+        state.found_plugins = [plugin for plugin in state.found_plugins if plugin[0] != plugin_name]
+        state.not_found_plugins = [plugin for plugin in state.not_found_plugins if plugin[0] != plugin_name]
+        state.jar_records.pop(plugin_name, None)
+
+    def summary(self):
+        found, not_found, _ = self.aggregate_view()
+        servers = {name: {"folder": state.get_plugin_folder(), "jars": len(state.jar_records),
+                          "found": len(state.found_plugins), "not_found": len(state.not_found_plugins)}
+                   for name, state in self.servers.items()}
+        return {"servers": servers, "jars": sum(server['jars'] for server in servers.values()),
+                "distinct_found": len(found), "distinct_not_found": len(not_found)}
+
+    async def check_for_updates(self):
+        # One update check for the whole network; each result carries the server its jar belongs to
+        entries = []
+        servers_by_path = {}
+        for name, state in self.servers.items():
+            for plugin_name, _, title, _, plugin_data, _ in state.found_plugins:
+                record = state.get_jar_record(plugin_name)
+                if record:
+                    entries.append((record, plugin_data, title))
+                    servers_by_path[record['path']] = name
+        update_checker = self.plugin_manager.update_checker
+        try:
+            with metrics.span("check_updates"):
+                updates = await update_checker.check_entries(entries)
+            failed = update_checker.failed
+        except Exception as e:
+            logger.error(f"Error checking updates: {e}")
+            logger.error(traceback.format_exc())
+            updates = []
+            failed = [{"source": None, "error": str(e), "paths": list(servers_by_path)}]
+        self.update_failures = [{"source": failure['source'], "error": failure['error'], "path": path,
+                                 "server": servers_by_path.get(path)}
+                                for failure in failed for path in failure['paths']]
+        return [{**update, "server": servers_by_path.get(update['path'])} for update in updates]